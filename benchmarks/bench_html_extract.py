@@ -0,0 +1,131 @@
+"""
+Benchmark: targeted extraction (html_extract) vs. a full html.parser tree
+
+Compares wall time and peak Python memory for the parses the scrapers do.
+Real pages saved from the live sites can be dropped into a fixture directory:
+
+    reddit_search.html   a Reddit search results page
+    blog_index.html      https://www.caplinked.com/blog/
+    blog_post.html       any CapLinked blog post
+
+Any page that is missing is replaced by a synthetic page of similar shape.
+
+Usage:
+    python benchmarks/bench_html_extract.py [--fixtures DIR] [--repeat N]
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from itertools import islice
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'caplinked_reddit_scraper'))
+
+from bs4 import BeautifulSoup  # noqa: E402
+from html_extract import PARSER, extract_first, iter_elements  # noqa: E402
+
+REDDIT_LINK = {'data-testid': 'internal-unauthenticated-link'}
+
+
+def synthetic_reddit_search(results=400):
+    """A search page padded with the nav, scripts and nested markup real Reddit pages carry"""
+    parts = ['<html><head>']
+    parts += [f'<script>window.__r{i} = {{"k": "{"x" * 2000}"}};</script>' for i in range(40)]
+    parts.append('</head><body><nav>' + '<a href="/r/popular/">Popular</a>' * 50 + '</nav>')
+    for i in range(results):
+        parts.append(
+            f'<div class="post"><div class="meta"><span>r/investing</span><span>{i}h ago</span></div>'
+            f'<a data-testid="internal-unauthenticated-link" href="/r/investing/comments/p{i:05d}/thread_{i}/">'
+            f'<span>Thread {i} about virtual data rooms and due diligence</span></a>'
+            + '<div class="body"><p>' + 'lorem ipsum dolor sit amet ' * 30 + '</p></div>'
+            + '<ul>' + '<li><button>vote</button></li>' * 10 + '</ul></div>'
+        )
+    parts.append('</body></html>')
+    return ''.join(parts)
+
+
+def synthetic_blog_index(posts=60):
+    parts = ['<html><head>' + '<link rel="stylesheet" href="/s.css">' * 30 + '</head><body>']
+    parts.append('<header>' + '<a href="/x">menu</a>' * 80 + '</header>')
+    for i in range(posts):
+        parts.append(
+            f'<article><h2>Post {i}</h2><a href="/blog/post-{i}/">Read</a><p>{"Excerpt text. " * 40}</p>'
+            f'<a class="uael-post__read-more" href="/blog/post-{i}/">Read more</a></article>'
+        )
+    parts.append('<footer>' + '<div><span>footer</span></div>' * 200 + '</footer></body></html>')
+    return ''.join(parts)
+
+
+def synthetic_blog_post():
+    body = ''.join(f'<p>Paragraph {i}. {"Virtual data rooms keep diligence moving. " * 12}</p>' for i in range(120))
+    return (
+        '<html><head>' + '<script>var a = 1;</script>' * 50 + '</head><body>'
+        + '<header>' + '<a href="/x">menu</a>' * 80 + '</header>'
+        + f'<h1>Sample Post</h1><div class="post-content">{body}</div>'
+        + '<aside>' + '<div><a href="/y">related</a></div>' * 150 + '</aside></body></html>'
+    )
+
+
+def load_fixture(fixtures, name, fallback):
+    path = os.path.join(fixtures, name) if fixtures else None
+    if path and os.path.exists(path):
+        with open(path, 'rb') as f:
+            return f.read(), path
+    return fallback(), 'synthetic'
+
+
+def measure(func, repeat):
+    """Return (best wall time in ms, peak traced memory in KiB)"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best * 1000, peak / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--fixtures', help='directory of saved HTML pages')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    reddit, reddit_src = load_fixture(args.fixtures, 'reddit_search.html', synthetic_reddit_search)
+    index, index_src = load_fixture(args.fixtures, 'blog_index.html', synthetic_blog_index)
+    post, post_src = load_fixture(args.fixtures, 'blog_post.html', synthetic_blog_post)
+
+    cases = [
+        (
+            f'reddit search, first 5 links ({len(reddit) // 1024} KiB, {reddit_src})',
+            lambda: BeautifulSoup(reddit, 'html.parser').find_all('a', REDDIT_LINK)[:5],
+            lambda: list(islice(iter_elements(reddit, 'a', REDDIT_LINK), 5)),
+        ),
+        (
+            f'blog index, read-more links ({len(index) // 1024} KiB, {index_src})',
+            lambda: BeautifulSoup(index, 'html.parser').find_all('a', class_='uael-post__read-more', limit=3),
+            lambda: list(islice(iter_elements(index, 'a', {'class': 'uael-post__read-more'}), 3)),
+        ),
+        (
+            f'blog post, content div ({len(post) // 1024} KiB, {post_src})',
+            lambda: BeautifulSoup(post, 'html.parser').find('div', class_='post-content').get_text(' ', strip=True),
+            lambda: extract_first(post, 'div', {'class': 'post-content'}).get_text(' ', strip=True),
+        ),
+    ]
+
+    print(f"html_extract backend: {PARSER}\n")
+    print(f"{'case':<60} {'full ms':>9} {'new ms':>9} {'speedup':>8} {'full KiB':>10} {'new KiB':>9}")
+    for name, full, targeted in cases:
+        full_ms, full_kib = measure(full, args.repeat)
+        new_ms, new_kib = measure(targeted, args.repeat)
+        print(f"{name:<60} {full_ms:>9.1f} {new_ms:>9.1f} {full_ms / new_ms:>7.1f}x {full_kib:>10.0f} {new_kib:>9.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""
+Benchmark: pooled keep-alive client (http_client) vs. module-level requests.get
+
+Issues the same sweep of GET requests both ways and reports wall time and how
+many TCP connections (and therefore TLS handshakes) each approach opened.
+By default the sweep runs against a local server, over TLS with a throwaway
+self-signed certificate when --tls is given (needs the openssl CLI). Point
+--url at a real endpoint to include real network and handshake latency; the
+connection count is then not available.
+
+Usage:
+    python benchmarks/bench_http_client.py [--requests 100] [--tls] [--url URL]
+"""
+
+import argparse
+import os
+import ssl
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import warnings
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'caplinked_reddit_scraper'))
+
+import requests  # noqa: E402
+import http_client  # noqa: E402
+
+
+class CountingServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.connections = 0
+        self.lock = threading.Lock()
+
+    def process_request(self, request, client_address):
+        with self.lock:
+            self.connections += 1
+        super().process_request(request, client_address)
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out in separate writes; without this, delayed ACKs stall keep-alive
+    disable_nagle_algorithm = True
+    body = b'<html><body>' + b'<p>ok</p>' * 200 + b'</body></html>'
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('Content-Length', str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, *args):
+        pass
+
+
+def self_signed_context(directory):
+    cert = os.path.join(directory, 'cert.pem')
+    key = os.path.join(directory, 'key.pem')
+    subprocess.run(
+        ['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '1',
+         '-subj', '/CN=localhost', '-keyout', key, '-out', cert],
+        check=True, capture_output=True
+    )
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert, key)
+    return context
+
+
+def sweep(get, url, count, verify):
+    start = time.perf_counter()
+    for _ in range(count):
+        get(url, timeout=10, verify=verify).raise_for_status()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--requests', type=int, default=100)
+    parser.add_argument('--tls', action='store_true', help='serve the local endpoint over TLS')
+    parser.add_argument('--url', help='benchmark against this URL instead of a local server')
+    args = parser.parse_args()
+
+    server = None
+    verify = True
+    url = args.url
+    if not url:
+        server = CountingServer(('127.0.0.1', 0), Handler)
+        scheme = 'http'
+        if args.tls:
+            tmp = tempfile.mkdtemp()
+            server.socket = self_signed_context(tmp).wrap_socket(server.socket, server_side=True)
+            scheme, verify = 'https', False
+            warnings.filterwarnings('ignore', message='Unverified HTTPS request')
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f'{scheme}://127.0.0.1:{server.server_address[1]}/'
+
+    print(f"{args.requests} sequential GETs to {url} (HTTP/2 {'on' if http_client.HTTP2_ENABLED else 'off'})\n")
+    print(f"{'client':<22} {'total s':>9} {'ms/req':>8} {'connections':>12}")
+
+    for name, get in [('requests.get', requests.get), ('http_client.get', http_client.get)]:
+        before = server.connections if server else 0
+        elapsed = sweep(get, url, args.requests, verify)
+        opened = str(server.connections - before) if server else 'n/a'
+        print(f"{name:<22} {elapsed:>9.2f} {elapsed * 1000 / args.requests:>8.2f} {opened:>12}")
+
+    if server:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,506 @@
+"""
+Benchmark: every pipeline end to end, offline, from recorded HTTP and LLM fixtures
+
+Runs reddit_scraper.main, quora_scraper.run_quora_scraper,
+content_pipeline.run_content_pipeline and main.run_linkedin_automation with all
+HTTP traffic (through http_client) and all OpenAI chat completions served from
+a fixture directory, each after an injected latency; embedding requests get
+deterministic word-hash vectors. Reports per-stage wall time, requests issued,
+bytes served to the parsers, LLM calls (chat and embedding) and peak RSS.
+
+Each pipeline runs in its own interpreter, in a scratch working directory, so
+its caches and state files start empty and RSS is its own. With --warm it runs
+a second time in the same directory to show the cached (repeat-run) cost.
+
+Fixtures: without --fixtures a synthetic set is generated (--write-fixtures DIR
+saves it for inspection or editing). --record DIR runs the pipelines against the
+live services once and saves what they fetched and generated, for later replay.
+Deliberate pacing (the LinkedIn token buckets, Quora's sleep
+between queries) is switched off unless --keep-pacing is given.
+
+Usage:
+    python benchmarks/bench_pipelines.py [--pipelines reddit,quora,content,linkedin]
+        [--fixtures DIR | --record DIR | --write-fixtures DIR]
+        [--http-latency MS] [--llm-latency MS] [--warm] [--keep-pacing]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from types import SimpleNamespace
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# name -> directory, module, entry point, and the (stage, module, attribute) calls timed as stages
+PIPELINES = {
+    'reddit': {
+        'dir': 'caplinked_reddit_scraper',
+        'module': 'reddit_scraper',
+        'entry': 'main',
+        'stages': [
+            ('fetch+parse', 'reddit_scraper', 'search_reddit_keyword'),
+            ('fetch+parse', 'reddit_scraper', 'search_reddit_subreddit'),
+            ('link', 'reddit_scraper', 'refresh_article_index'),
+            ('link', 'reddit_scraper', 'attach_articles'),
+            ('generate', 'reddit_scraper', '_batch_comments'),
+            ('emit', 'results_store', 'ResultsStore.append'),
+        ],
+    },
+    'quora': {
+        'dir': 'caplinked_quora_scraper',
+        'module': 'quora_scraper',
+        'entry': 'run_quora_scraper',
+        'stages': [
+            ('fetch+parse', 'quora_scraper', 'scrape_quora_questions'),
+        ],
+    },
+    'content': {
+        'dir': 'caplinked_youtube_automation',
+        'module': 'content_pipeline',
+        'entry': 'run_content_pipeline',
+        'stages': [
+            ('discover', 'content_pipeline', 'get_latest_blog_posts'),
+            ('fetch+parse', 'content_pipeline', 'get_blog_content'),
+            ('generate', 'content_pipeline', 'generate_video_script'),
+        ],
+    },
+    'linkedin': {
+        'dir': 'caplinked_linkedin_automation',
+        'module': 'main',
+        'entry': 'run_linkedin_automation',
+        'stages': [
+            ('discover', 'main', 'scrape_blog_posts'),
+            ('fetch+parse', 'post_pipeline', 'get_blog_content'),
+            ('generate', 'main', 'generate_post_with_blog_link'),
+            ('publish', 'linkedin_poster', 'LinkedInPoster.post_blog_content'),
+        ],
+    },
+}
+
+# Size of replayed embeddings; recorded runs keep whatever the model returned
+EMBEDDING_DIMENSIONS = 256
+
+BENCH_ENV = {
+    'OPENAI_API_KEY': 'sk-bench',
+    'LINKEDIN_ACCESS_TOKEN': 'bench-token',
+    'LINKEDIN_ORGANIZATION_ID': '1',
+}
+
+
+# --- fixtures ---------------------------------------------------------------
+
+class Fixtures:
+    """
+    HTTP exchanges and LLM completions on disk.
+
+    http.json holds [{"method", "url" or "pattern", "status", "headers", "bodies"}]
+    with bodies stored as files under bodies/; an entry with several bodies serves
+    them in turn. llm.json holds [{"key" or "contains", "content"}]: a completion is
+    matched by the hash of its request first, then by the first "contains" rule
+    found in the prompt ("" matches anything). "{call}" in a replayed completion
+    becomes the call number, so repeated replies can be told apart.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.http = self._load('http.json')
+        self.llm = self._load('llm.json')
+        self._turns = {}
+        self._lock = threading.Lock()
+
+    def _load(self, name):
+        try:
+            with open(os.path.join(self.path, name)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return []
+
+    def save(self):
+        os.makedirs(self.path, exist_ok=True)
+        for name, data in (('http.json', self.http), ('llm.json', self.llm)):
+            with open(os.path.join(self.path, name), 'w') as f:
+                json.dump(data, f, indent=2)
+
+    def add_body(self, body):
+        name = 'bodies/' + hashlib.sha1(body).hexdigest() + '.bin'
+        os.makedirs(os.path.join(self.path, 'bodies'), exist_ok=True)
+        with open(os.path.join(self.path, name), 'wb') as f:
+            f.write(body)
+        return name
+
+    def record_http(self, method, url, status, headers, body):
+        with self._lock:
+            entry = next((e for e in self.http if e.get('url') == url and e['method'] == method), None)
+            if entry is None:
+                entry = {'method': method, 'url': url, 'status': status, 'headers': headers, 'bodies': []}
+                self.http.append(entry)
+            entry['bodies'].append(self.add_body(body))
+
+    def match_http(self, method, url):
+        """Return (status, headers, body) for a request, or None when nothing matches"""
+        entry = next((e for e in self.http if e.get('url') == url and e['method'] == method), None)
+        if entry is None:
+            entry = next((e for e in self.http if e.get('pattern') and e['method'] == method
+                          and re.search(e['pattern'], url)), None)
+        if entry is None:
+            return None
+        with self._lock:
+            turn = self._turns.get(id(entry), 0)
+            self._turns[id(entry)] = turn + 1
+        with open(os.path.join(self.path, entry['bodies'][turn % len(entry['bodies'])]), 'rb') as f:
+            body = f.read()
+        return entry['status'], entry.get('headers', {}), body
+
+    def match_llm(self, key, prompt):
+        for entry in self.llm:
+            if entry.get('key') == key:
+                return entry['content']
+        for entry in self.llm:
+            if 'contains' in entry and entry['contains'] in prompt:
+                return entry['content']
+        return None
+
+
+def llm_key(kwargs):
+    return hashlib.sha256(json.dumps(
+        [kwargs.get('model'), kwargs.get('messages'), kwargs.get('response_format')], sort_keys=True, default=str
+    ).encode('utf-8')).hexdigest()
+
+
+def _reddit_listing(page, per_page=25):
+    children = []
+    for i in range(per_page):
+        # Neighbouring pages overlap by a few threads, as keyword searches do
+        n = page * (per_page - 5) + i
+        children.append({'kind': 't3', 'data': {
+            'id': f'b{n:05d}', 'subreddit': 'investing', 'created_utc': 1_700_000_000 + n,
+            'title': f'Thread {n}: choosing a virtual data room for due diligence',
+            'permalink': f'/r/investing/comments/b{n:05d}/thread_{n}/',
+            'selftext': 'lorem ipsum dolor sit amet ' * 30,
+        }})
+    return json.dumps({'kind': 'Listing', 'data': {'after': None, 'children': children}}).encode('utf-8')
+
+
+def _quora_page(page):
+    links = ''.join(
+        f'<div><a class="q-box" href="/What-is-question-{page}-{i}">What is the best VDR for question {page}-{i}?</a></div>'
+        for i in range(10)
+    )
+    return f'<html><body><header>{"<a href=/x>menu</a>" * 40}</header>{links}</body></html>'.encode('utf-8')
+
+
+def _blog_feed(posts):
+    items = ''.join(
+        f'<item><title>Blog post {i}</title><link>https://www.caplinked.com/blog/post-{i}/</link>'
+        f'<description>Why virtual data rooms matter for deal {i}.</description>'
+        f'<pubDate>Mon, {i + 1:02d} Jan 2024 10:00:00 +0000</pubDate></item>'
+        for i in range(posts)
+    )
+    return f'<?xml version="1.0"?><rss version="2.0"><channel><title>CapLinked</title>{items}</channel></rss>'.encode('utf-8')
+
+
+_TOPICS = ['sell-side diligence', 'fundraising data rooms', 'audit trails', 'board reporting', 'secure file sharing']
+
+
+def _blog_post(i):
+    # Distinct vocabulary per post, so the near-duplicate checks treat them as different articles
+    topic = _TOPICS[i % len(_TOPICS)]
+    paragraphs = ''.join(
+        f'<p>Paragraph {p} on {topic} ({i}): {" ".join(f"{topic.split()[0]}{i}w{p}k{k}" for k in range(12))}. '
+        f'Virtual data rooms keep {topic} moving for deal {p}. Share this post on LinkedIn.</p>'
+        for p in range(80)
+    )
+    return (
+        '<html><head>' + '<script>var a = 1;</script>' * 50 + '</head><body>'
+        + '<header>' + '<a href="/x">menu</a>' * 80 + '</header>'
+        + f'<h1>Blog post {i}</h1><article><div class="post-content">{paragraphs}</div></article>'
+        + '<aside>' + '<div><a href="/y">related</a></div>' * 150 + '</aside></body></html>'
+    ).encode('utf-8')
+
+
+def write_synthetic_fixtures(path):
+    """A fixture set shaped like the live sites and model replies"""
+    fixtures = Fixtures(path)
+    fixtures.http = [
+        {'method': 'GET', 'pattern': r'^https://www\.reddit\.com/(r/[^/]+/)?search\.json', 'status': 200,
+         'headers': {'Content-Type': 'application/json'}, 'bodies': [fixtures.add_body(_reddit_listing(p)) for p in range(40)]},
+        {'method': 'GET', 'pattern': r'^https://www\.quora\.com/search', 'status': 200,
+         'headers': {'Content-Type': 'text/html'}, 'bodies': [fixtures.add_body(_quora_page(p)) for p in range(5)]},
+        {'method': 'GET', 'url': 'https://www.caplinked.com/blog/feed/', 'status': 200,
+         'headers': {'Content-Type': 'application/rss+xml'}, 'bodies': [fixtures.add_body(_blog_feed(5))]},
+    ] + [
+        {'method': 'GET', 'url': f'https://www.caplinked.com/blog/post-{i}/', 'status': 200,
+         'headers': {'Content-Type': 'text/html'}, 'bodies': [fixtures.add_body(_blog_post(i))]}
+        for i in range(5)
+    ] + [
+        {'method': 'POST', 'pattern': r'^https://api\.linkedin\.com/rest/posts$', 'status': 201,
+         'headers': {'Content-Type': 'application/json'},
+         'bodies': [fixtures.add_body(json.dumps({'id': 'urn:li:share:7000000000000000001'}).encode('utf-8'))]},
+    ]
+    fixtures.llm = [
+        {'contains': 'Respond with JSON only', 'content': json.dumps({'comments': [
+            {'id': i, 'comment': f'Comment {i}: a good VDR makes diligence easier; CapLinked is worth a look.'}
+            for i in range(1, 41)
+        ]})},
+        {'contains': 'video script', 'content': 'Narrator: ' + 'Virtual data rooms keep deals moving. ' * 60},
+        {'contains': '', 'content': ' '.join(f'Point {{call}}.{k}: deal {{call}} moves faster with step {k}.' for k in range(12))
+         + ' #MergersAndAcquisitions'},
+    ]
+    fixtures.save()
+    return fixtures
+
+
+# --- child: one pipeline run under replay -----------------------------------
+
+class StageTimer:
+    """Records the start and end of every call to the wrapped functions, per stage"""
+
+    def __init__(self):
+        self.calls = {}
+        self._lock = threading.Lock()
+
+    def wrap(self, stage, func):
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self.calls.setdefault(stage, []).append((start, time.perf_counter()))
+        return timed
+
+    def report(self):
+        return {
+            stage: {
+                'calls': len(spans),
+                'wall': max(end for _, end in spans) - min(start for start, _ in spans),
+                'busy': sum(end - start for start, end in spans),
+            }
+            for stage, spans in self.calls.items()
+        }
+
+
+def _install_http(http_client, fixtures, latency, counters, record):
+    import requests
+    from requests.structures import CaseInsensitiveDict
+
+    live = http_client.PooledSession() if record else None
+
+    class ReplaySession(http_client.PooledSession):
+        def request(self, method, url, params=None, **kwargs):
+            url = requests.Request(method, url, params=params).prepare().url
+            with counters['lock']:
+                counters['requests'] += 1
+
+            if record:
+                response = live.request(method, url, **kwargs)
+                fixtures.record_http(method, url, response.status_code,
+                                     {'Content-Type': response.headers.get('Content-Type', '')}, response.content)
+                with counters['lock']:
+                    counters['bytes'] += len(response.content)
+                return response
+
+            time.sleep(latency)
+            match = fixtures.match_http(method, url)
+            status, headers, body = match if match else (404, {}, b'')
+            response = requests.Response()
+            response.status_code = status
+            response.headers = CaseInsensitiveDict(headers)
+            response._content = body
+            response._content_consumed = True
+            response.encoding = 'utf-8'
+            response.url = url
+            response.request = requests.Request(method, url).prepare()
+            with counters['lock']:
+                counters['bytes'] += len(body)
+                counters['unmatched'] += match is None
+            return response
+
+    http_client._session = ReplaySession()
+
+
+def _install_llm(fixtures, latency, counters, record):
+    from openai.resources.chat import completions
+
+    original = completions.Completions.create
+
+    def create(self, *args, **kwargs):
+        with counters['lock']:
+            counters['llm_calls'] += 1
+            call = counters['llm_calls']
+        key = llm_key(kwargs)
+        if record:
+            response = original(self, *args, **kwargs)
+            with fixtures._lock:
+                fixtures.llm.append({'key': key, 'content': response.choices[0].message.content})
+            return response
+        time.sleep(latency)
+        prompt = '\n'.join(str(m.get('content', '')) for m in kwargs.get('messages', []))
+        content = fixtures.match_llm(key, prompt)
+        if content is not None:
+            content = content.replace('{call}', str(call))
+        else:
+            content = ''
+            with counters['lock']:
+                counters['unmatched'] += 1
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+    completions.Completions.create = create
+
+    from openai.resources import embeddings
+    original_embed = embeddings.Embeddings.create
+
+    def embed(self, *args, **kwargs):
+        with counters['lock']:
+            counters['llm_calls'] += 1
+        if record:
+            return original_embed(self, *args, **kwargs)
+        time.sleep(latency)
+        # Deterministic stand-ins: texts sharing words get correlated vectors
+        import numpy as np
+        vectors = []
+        for text in kwargs['input']:
+            vector = np.zeros(EMBEDDING_DIMENSIONS)
+            for word in text.lower().split():
+                seed = int.from_bytes(hashlib.blake2b(word.encode('utf-8'), digest_size=4).digest(), 'little')
+                vector += np.random.default_rng(seed).standard_normal(EMBEDDING_DIMENSIONS)
+            vectors.append(SimpleNamespace(embedding=vector.tolist()))
+        return SimpleNamespace(data=vectors)
+
+    embeddings.Embeddings.create = embed
+
+
+def _disable_pacing(name, modules):
+    if name == 'quora':
+        modules['quora_scraper'].time = SimpleNamespace(sleep=lambda seconds: None)
+    if name == 'linkedin':
+        import rate_limiter
+        rate_limiter.ENDPOINT_LIMITS = {}
+        rate_limiter.DEFAULT_LIMIT = (1e6, 1e6)
+
+
+def run_child(args):
+    import importlib
+    import io
+    import contextlib
+
+    spec = PIPELINES[args.child]
+    sys.path.insert(0, os.path.join(ROOT, spec['dir']))
+    fixtures = Fixtures(args.fixtures)
+    counters = {'requests': 0, 'bytes': 0, 'llm_calls': 0, 'unmatched': 0, 'lock': threading.Lock()}
+
+    import http_client
+    _install_http(http_client, fixtures, args.http_latency / 1000, counters, args.record)
+    _install_llm(fixtures, args.llm_latency / 1000, counters, args.record)
+
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+        module = importlib.import_module(spec['module'])
+        modules = {spec['module']: module}
+        timer = StageTimer()
+        for stage, module_name, attr in spec['stages']:
+            owner = modules.setdefault(module_name, importlib.import_module(module_name))
+            *path, name = attr.split('.')
+            for part in path:
+                owner = getattr(owner, part)
+            setattr(owner, name, timer.wrap(stage, getattr(owner, name)))
+        if not args.keep_pacing:
+            _disable_pacing(args.child, modules)
+
+        start = time.perf_counter()
+        getattr(module, spec['entry'])()
+        wall = time.perf_counter() - start
+
+    if args.record:
+        fixtures.save()
+    if args.verbose:
+        sys.stderr.write(output.getvalue())
+
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    result = {
+        'wall': wall,
+        'stages': timer.report(),
+        'requests': counters['requests'],
+        'bytes': counters['bytes'],
+        'llm_calls': counters['llm_calls'],
+        'unmatched': counters['unmatched'],
+        # ru_maxrss is KiB on Linux, bytes on macOS
+        'peak_rss_mib': rss / (1024 * 1024 if sys.platform == 'darwin' else 1024),
+    }
+    with open(args.out, 'w') as f:
+        json.dump(result, f)
+
+
+# --- parent -------------------------------------------------------------------
+
+def run_pipeline(name, args, fixtures_dir, workdir):
+    out = os.path.join(workdir, '.bench_result.json')
+    command = [
+        sys.executable, os.path.abspath(__file__), '--child', name, '--fixtures', fixtures_dir, '--out', out,
+        '--http-latency', str(args.http_latency), '--llm-latency', str(args.llm_latency),
+    ]
+    for flag in ('record', 'keep_pacing', 'verbose'):
+        if getattr(args, flag):
+            command.append('--' + flag.replace('_', '-'))
+    subprocess.run(command, cwd=workdir, env={**os.environ, **BENCH_ENV}, check=True)
+    with open(out) as f:
+        return json.load(f)
+
+
+def print_result(label, result):
+    print(f"{label:<16} {result['wall']:>8.2f} {result['requests']:>9} {result['bytes'] / 1024:>10.0f} "
+          f"{result['llm_calls']:>5} {result['peak_rss_mib']:>9.1f}"
+          + (f"   ({result['unmatched']} unmatched)" if result['unmatched'] else ''))
+    for stage, timing in result['stages'].items():
+        print(f"  {stage:<14} {timing['wall']:>8.2f}s wall {timing['busy']:>8.2f}s busy {timing['calls']:>5} calls")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--pipelines', default=','.join(PIPELINES))
+    parser.add_argument('--fixtures', help='replay this fixture directory instead of synthetic fixtures')
+    parser.add_argument('--record', metavar='DIR', help='run against live services and save fixtures to DIR')
+    parser.add_argument('--write-fixtures', metavar='DIR', help='write the synthetic fixture set to DIR and use it')
+    parser.add_argument('--http-latency', type=float, default=50, help='ms added to every replayed request')
+    parser.add_argument('--llm-latency', type=float, default=800, help='ms added to every replayed completion')
+    parser.add_argument('--warm', action='store_true', help='run each pipeline again with its caches filled')
+    parser.add_argument('--keep-pacing', action='store_true', help='keep deliberate sleeps and publish throttling')
+    parser.add_argument('--verbose', action='store_true', help="show the pipelines' own output")
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    parser.add_argument('--out', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args)
+        return
+
+    if args.record:
+        fixtures_dir = os.path.abspath(args.record)
+    elif args.fixtures:
+        fixtures_dir = os.path.abspath(args.fixtures)
+    else:
+        fixtures_dir = os.path.abspath(args.write_fixtures or tempfile.mkdtemp(prefix='bench_fixtures_'))
+        write_synthetic_fixtures(fixtures_dir)
+
+    mode = 'recording live traffic' if args.record else f'replaying {fixtures_dir}'
+    print(f"{mode}; HTTP latency {args.http_latency:g} ms, LLM latency {args.llm_latency:g} ms"
+          f"{', pacing kept' if args.keep_pacing else ''}\n")
+    print(f"{'pipeline':<16} {'wall s':>8} {'requests':>9} {'KiB parsed':>10} {'LLM':>5} {'peak MiB':>9}")
+
+    for name in args.pipelines.split(','):
+        workdir = tempfile.mkdtemp(prefix=f'bench_{name}_')
+        print_result(name, run_pipeline(name, args, fixtures_dir, workdir))
+        if args.warm and not args.record:
+            print_result(f'{name} (warm)', run_pipeline(name, args, fixtures_dir, workdir))
+
+
+if __name__ == '__main__':
+    main()
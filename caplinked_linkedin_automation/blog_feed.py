@@ -0,0 +1,306 @@
+"""
+Incremental blog discovery from the RSS/Atom feed or sitemap
+Tracks a per-consumer high-water mark of the newest pubDate/lastmod seen, so a daily run
+costs one small (usually 304 Not Modified) XML fetch and returns only posts that are new;
+posts past the mark are tracked one by one until each is finished or given up
+"""
+
+import re
+import sqlite3
+import threading
+import xml.etree.ElementTree as ElementTree
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+import requests
+
+try:
+    from .http_cache import fetch_parsed
+except ImportError:
+    from http_cache import fetch_parsed
+
+# Tried in order; the first that yields entries wins
+DISCOVERY_URLS = (
+    "https://www.caplinked.com/blog/feed/",
+    "https://www.caplinked.com/feed/",
+    "https://www.caplinked.com/post-sitemap.xml",
+    "https://www.caplinked.com/sitemap.xml",
+)
+
+BLOG_FEED_FILE = 'blog_feed.db'
+
+EXCERPT_LENGTH = 300
+
+# Runs a post may fail in before it is given up, so one bad post can't hold the mark back forever
+MAX_POST_ATTEMPTS = 3
+
+_TAG = re.compile(r'<[^>]+>')
+
+_lock = threading.Lock()
+# Dated posts returned per consumer in this process ({url: published}), waiting for commit_discovered()
+_pending = {}
+
+
+def _local(tag):
+    return tag.rsplit('}', 1)[-1]
+
+
+def _child_text(element, *names):
+    for child in element:
+        if _local(child.tag) in names and child.text:
+            return child.text.strip()
+    return ""
+
+
+def _parse_date(value):
+    """RFC 822 (RSS) or ISO 8601 (Atom, sitemap) date as a UTC ISO string, or None"""
+    if not value:
+        return None
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        try:
+            parsed = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc).isoformat()
+
+
+def _title_from_url(url):
+    slug = url.rstrip('/').rsplit('/', 1)[-1]
+    return slug.replace('-', ' ').title()
+
+
+def _excerpt(html):
+    text = ' '.join(_TAG.sub(' ', html).split())
+    return text if len(text) <= EXCERPT_LENGTH else text[:EXCERPT_LENGTH - 3] + "..."
+
+
+def parse_feed(body):
+    """
+    Parse an RSS, Atom, sitemap or sitemap-index document.
+
+    Returns a list of {'url', 'title', 'excerpt', 'published'} dicts (published
+    is a UTC ISO string or None). Sitemap-index children come back with
+    'sitemap': True so the caller can follow them.
+    """
+    root = ElementTree.fromstring(body)
+    entries = []
+    for element in root.iter():
+        kind = _local(element.tag)
+        if kind == 'item':
+            url = _child_text(element, 'link')
+            entries.append({
+                'url': url,
+                'title': _child_text(element, 'title') or _title_from_url(url),
+                'excerpt': _excerpt(_child_text(element, 'description')),
+                'published': _parse_date(_child_text(element, 'pubDate', 'date')),
+            })
+        elif kind == 'entry':
+            link = next((child.get('href') for child in element
+                         if _local(child.tag) == 'link' and child.get('rel', 'alternate') == 'alternate'), "")
+            entries.append({
+                'url': link,
+                'title': _child_text(element, 'title') or _title_from_url(link),
+                'excerpt': _excerpt(_child_text(element, 'summary', 'content')),
+                'published': _parse_date(_child_text(element, 'published', 'updated')),
+            })
+        elif kind in ('url', 'sitemap'):
+            url = _child_text(element, 'loc')
+            # Sitemaps also list the home page and blog index
+            if kind == 'url' and urlparse(url).path.rstrip('/') in ('', '/blog'):
+                continue
+            entry = {
+                'url': url,
+                'title': _title_from_url(url),
+                'excerpt': "",
+                'published': _parse_date(_child_text(element, 'lastmod')),
+            }
+            if kind == 'sitemap':
+                entry['sitemap'] = True
+            entries.append(entry)
+    return [entry for entry in entries if entry['url']]
+
+
+def _connect():
+    conn = sqlite3.connect(BLOG_FEED_FILE)
+    conn.execute(
+        """CREATE TABLE IF NOT EXISTS high_water (
+            consumer TEXT PRIMARY KEY,
+            published TEXT NOT NULL
+        )"""
+    )
+    # Posts past a consumer's mark: done once finished or given up, else failed attempts so far
+    conn.execute(
+        """CREATE TABLE IF NOT EXISTS handled (
+            consumer TEXT NOT NULL,
+            url TEXT NOT NULL,
+            published TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            done INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (consumer, url)
+        )"""
+    )
+    return conn
+
+
+def get_high_water(consumer):
+    """Newest publish date consumer has committed, or None before its first run"""
+    with _lock:
+        conn = _connect()
+        try:
+            row = conn.execute("SELECT published FROM high_water WHERE consumer = ?", (consumer,)).fetchone()
+        finally:
+            conn.close()
+    return row[0] if row else None
+
+
+def _done_urls(consumer):
+    with _lock:
+        conn = _connect()
+        try:
+            rows = conn.execute("SELECT url FROM handled WHERE consumer = ? AND done = 1", (consumer,)).fetchall()
+        finally:
+            conn.close()
+    return {url for (url,) in rows}
+
+
+def _fetch_entries(url, since, fetch):
+    entries = fetch_parsed(url, parse_feed, parser_key="blog_feed", timeout=15, fetch=fetch)
+    posts = []
+    for entry in entries:
+        if entry.get('sitemap'):
+            # Only follow child sitemaps that changed since the mark (and that hold posts, when named)
+            if since and entry['published'] and entry['published'] <= since:
+                continue
+            if any('post' in e['url'] for e in entries if e.get('sitemap')) and 'post' not in entry['url']:
+                continue
+            posts.extend(_fetch_entries(entry['url'], since, fetch))
+        else:
+            posts.append(entry)
+    return posts
+
+
+def discover_new_posts(consumer, limit, fetch=None):
+    """
+    Return up to limit blog posts published after consumer's high-water mark, newest first.
+
+    On the first run (no mark yet) the newest limit posts are returned; after
+    that, the oldest limit posts past the mark, so none are skipped. Posts
+    commit_discovered() recorded as finished or given up are left out. The
+    mark only moves when commit_discovered(consumer) is called, and never
+    past a post still pending, so a run that dies or fails partway sees the
+    posts it didn't finish again. Returns None when no discovery URL yields
+    any entries, so the caller can fall back to scraping the blog index.
+    """
+    since = get_high_water(consumer)
+    for url in DISCOVERY_URLS:
+        try:
+            entries = _fetch_entries(url, since, fetch)
+        except (requests.RequestException, ElementTree.ParseError):
+            # Missing feed (404), network failure or malformed XML: try the next source
+            continue
+        if not entries:
+            continue
+        done = _done_urls(consumer)
+        entries = [e for e in entries if e['url'] not in done]
+
+        dated = sorted((e for e in entries if e['published']), key=lambda e: e['published'], reverse=True)
+        if since:
+            # Oldest new posts first, so a backlog larger than limit drains over several runs
+            posts = [e for e in dated if e['published'] > since][-limit:]
+        else:
+            posts = (dated or entries)[:limit]
+        for post in posts:
+            post['scraped_at'] = datetime.now().isoformat()
+            post['source'] = url
+
+        with _lock:
+            _pending.setdefault(consumer, {}).update((p['url'], p['published']) for p in posts if p['published'])
+        return posts
+    return None
+
+
+def list_all_posts(sources=DISCOVERY_URLS, fetch=None):
+    """
+    Every post listed by the first of sources that yields entries, newest first.
+
+    Ignores high-water marks; the fetches are conditional, so an unchanged
+    feed or sitemap costs a 304. Returns None when no source works.
+    """
+    for url in sources:
+        try:
+            entries = _fetch_entries(url, None, fetch)
+        except (requests.RequestException, ElementTree.ParseError):
+            continue
+        if entries:
+            return sorted(entries, key=lambda e: e['published'] or '', reverse=True)
+    return None
+
+
+def commit_discovered(consumer, finished=None):
+    """
+    Record how consumer's run went with the posts discover_new_posts returned, and advance its mark.
+
+    finished is the set of URLs the run got through (every returned post when
+    None); those are never returned to consumer again. Any other returned
+    post is returned by later runs until it finishes or has failed
+    MAX_POST_ATTEMPTS times, when it is given up. The mark moves to the
+    newest finished or given-up post older than every post still pending.
+    Returns the URLs given up by this call.
+    """
+    with _lock:
+        discovered = _pending.pop(consumer, {})
+        if finished is None:
+            finished = discovered
+        conn = _connect()
+        try:
+            for url, published in discovered.items():
+                if url in finished:
+                    conn.execute(
+                        "INSERT INTO handled (consumer, url, published, done) VALUES (?, ?, ?, 1) "
+                        "ON CONFLICT(consumer, url) DO UPDATE SET done = 1",
+                        (consumer, url, published)
+                    )
+                else:
+                    conn.execute(
+                        "INSERT INTO handled (consumer, url, published, attempts) VALUES (?, ?, ?, 1) "
+                        "ON CONFLICT(consumer, url) DO UPDATE SET attempts = attempts + 1",
+                        (consumer, url, published)
+                    )
+            given_up = [url for (url,) in conn.execute(
+                "SELECT url FROM handled WHERE consumer = ? AND done = 0 AND attempts >= ?",
+                (consumer, MAX_POST_ATTEMPTS)
+            )]
+            conn.execute(
+                "UPDATE handled SET done = 1 WHERE consumer = ? AND done = 0 AND attempts >= ?",
+                (consumer, MAX_POST_ATTEMPTS)
+            )
+
+            oldest_pending = conn.execute(
+                "SELECT MIN(published) FROM handled WHERE consumer = ? AND done = 0", (consumer,)
+            ).fetchone()[0]
+            if oldest_pending is None:
+                newest = conn.execute(
+                    "SELECT MAX(published) FROM handled WHERE consumer = ? AND done = 1", (consumer,)
+                ).fetchone()[0]
+            else:
+                newest = conn.execute(
+                    "SELECT MAX(published) FROM handled WHERE consumer = ? AND done = 1 AND published < ?",
+                    (consumer, oldest_pending)
+                ).fetchone()[0]
+            if newest:
+                conn.execute(
+                    "INSERT INTO high_water (consumer, published) VALUES (?, ?) "
+                    "ON CONFLICT(consumer) DO UPDATE SET published = MAX(published, excluded.published)",
+                    (consumer, newest)
+                )
+                # Posts at or behind the mark are never returned again, so their records can go
+                conn.execute("DELETE FROM handled WHERE consumer = ? AND published <= ?", (consumer, newest))
+            conn.commit()
+        finally:
+            conn.close()
+    return given_up
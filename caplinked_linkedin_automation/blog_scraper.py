@@ -4,9 +4,13 @@ Extracts latest blog posts from CapLinked blog for LinkedIn content generation
 """
 
 import requests
-from bs4 import BeautifulSoup
 import logging
 from datetime import datetime
+from http_cache import fetch_parsed
+from html_extract import extract
+from blog_corpus import get_reduced_article
+from blog_feed import discover_new_posts, commit_discovered
+from prompt_budget import fit_to_budget
 
 logging.basicConfig(
     level=logging.INFO,
@@ -16,80 +20,105 @@ logger = logging.getLogger(__name__)
 
 BLOG_URL = "https://www.caplinked.com/blog/"
 
+# High-water mark name in blog_feed.db, shared by all LinkedIn entry points
+FEED_CONSUMER = "linkedin"
+
+# Article text kept per post: the most informative sentences within this many tokens
+BLOG_CONTENT_TOKENS = 1000
+
+def _parse_blog_index(html, limit):
+    """Extract post summaries from the blog index page"""
+    # Find blog post links - adjust selectors based on CapLinked blog structure
+    posts = []
+    
+    # Look for post containers (adjust selector if needed); only the containers are parsed
+    post_containers = extract(html, 'article', limit=limit)
+    
+    if not post_containers:
+        # Alternative selector if articles not found
+        post_containers = extract(html, 'div', {'class': 'post'}, limit=limit)
+    
+    if not post_containers:
+        # Another alternative
+        post_containers = extract(html, 'div', {'class': 'blog-post'}, limit=limit)
+    
+    for container in post_containers:
+        try:
+            # Extract title
+            title_elem = container.find('h2') or container.find('h3') or container.find('a')
+            if not title_elem:
+                continue
+            
+            title = title_elem.get_text(strip=True)
+            
+            # Extract URL
+            link_elem = container.find('a', href=True)
+            if not link_elem:
+                continue
+            
+            url = link_elem['href']
+            if not url.startswith('http'):
+                url = BLOG_URL.rstrip('/') + url
+            
+            # Extract excerpt/content
+            excerpt_elem = container.find('p') or container.find('div', class_='excerpt')
+            excerpt = excerpt_elem.get_text(strip=True) if excerpt_elem else ""
+            
+            # Limit excerpt to first 300 characters
+            if len(excerpt) > 300:
+                excerpt = excerpt[:297] + "..."
+            
+            posts.append({
+                'title': title,
+                'excerpt': excerpt,
+                'url': url,
+                'scraped_at': datetime.now().isoformat()
+            })
+            
+            logger.info(f"Scraped: {title}")
+        
+        except Exception as e:
+            logger.warning(f"Error scraping post: {e}")
+            continue
+    
+    return posts
+
+
 def scrape_blog_posts(limit=10):
     """
     Scrape latest blog posts from CapLinked blog
     
+    Posts are discovered from the blog's RSS feed or sitemap first, which
+    returns only posts newer than the last run that called
+    mark_blog_posts_seen(). Only when no feed is available is the index page
+    scraped; it is revalidated with ETag/Last-Modified, and when it has not
+    changed since the last run the previously parsed posts are returned.
+    
     Args:
         limit: Number of posts to retrieve (default 3)
     
     Returns:
         List of blog post dictionaries with title, content, and URL
     """
+    feed_posts = discover_new_posts(FEED_CONSUMER, limit)
+    if feed_posts is not None:
+        logger.info(f"Found {len(feed_posts)} new blog posts in the blog feed")
+        return feed_posts
+    
     try:
-        logger.info(f"Fetching blog posts from {BLOG_URL}")
+        logger.info(f"No blog feed available; fetching blog posts from {BLOG_URL}")
         
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
         
-        response = requests.get(BLOG_URL, headers=headers, timeout=15)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Find blog post links - adjust selectors based on CapLinked blog structure
-        posts = []
-        
-        # Look for post containers (adjust selector if needed)
-        post_containers = soup.find_all('article', limit=limit)
-        
-        if not post_containers:
-            # Alternative selector if articles not found
-            post_containers = soup.find_all('div', class_='post', limit=limit)
-        
-        if not post_containers:
-            # Another alternative
-            post_containers = soup.find_all('div', class_='blog-post', limit=limit)
-        
-        for container in post_containers:
-            try:
-                # Extract title
-                title_elem = container.find('h2') or container.find('h3') or container.find('a')
-                if not title_elem:
-                    continue
-                
-                title = title_elem.get_text(strip=True)
-                
-                # Extract URL
-                link_elem = container.find('a', href=True)
-                if not link_elem:
-                    continue
-                
-                url = link_elem['href']
-                if not url.startswith('http'):
-                    url = BLOG_URL.rstrip('/') + url
-                
-                # Extract excerpt/content
-                excerpt_elem = container.find('p') or container.find('div', class_='excerpt')
-                excerpt = excerpt_elem.get_text(strip=True) if excerpt_elem else ""
-                
-                # Limit excerpt to first 300 characters
-                if len(excerpt) > 300:
-                    excerpt = excerpt[:297] + "..."
-                
-                posts.append({
-                    'title': title,
-                    'excerpt': excerpt,
-                    'url': url,
-                    'scraped_at': datetime.now().isoformat()
-                })
-                
-                logger.info(f"Scraped: {title}")
-            
-            except Exception as e:
-                logger.warning(f"Error scraping post: {e}")
-                continue
+        posts = fetch_parsed(
+            BLOG_URL,
+            lambda html: _parse_blog_index(html, limit),
+            parser_key=f"blog_index:{limit}",
+            headers=headers,
+            timeout=15
+        )
         
         logger.info(f"Successfully scraped {len(posts)} blog posts")
         return posts
@@ -102,51 +131,49 @@ def scrape_blog_posts(limit=10):
         return []
 
 
-def get_blog_content(url):
+def mark_blog_posts_seen(finished=None):
+    """
+    Advance the feed high-water mark past the posts scrape_blog_posts returned this run
+    
+    Args:
+        finished: URLs of the posts this run got through (all when None); any other
+            returned post is offered again by later runs, up to MAX_POST_ATTEMPTS
+            failed runs in blog_feed.py, after which it is given up
+    """
+    for url in commit_discovered(FEED_CONSUMER, finished):
+        logger.error(f"Giving up on blog post after repeated failures: {url}")
+
+
+def get_blog_content(url, last_modified=None):
     """
     Get full content from a specific blog post
     
+    The full article text is kept in the local blog corpus (blog_corpus.db), so a
+    post already stored, and not modified since, is served without any request;
+    its budgeted text is stored there too, so it is only computed once per post.
+    
     Args:
         url: Blog post URL
+        last_modified: Post's publish/modified date from the feed, if known
     
     Returns:
         Dictionary with full post content
     """
     try:
-        logger.info(f"Fetching full content from {url}")
-        
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
-        
-        response = requests.get(url, headers=headers, timeout=15)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Extract title
-        title = soup.find('h1')
-        title = title.get_text(strip=True) if title else "Untitled"
-        
-        # Extract main content
-        content_elem = soup.find('article') or soup.find('div', class_='post-content') or soup.find('div', class_='content')
-        
-        if content_elem:
-            # Remove script and style elements
-            for script in content_elem(['script', 'style']):
-                script.decompose()
-            
-            content = content_elem.get_text(separator=' ', strip=True)
-        else:
-            content = ""
-        
-        # Limit content to first 4000 characters for processing
-        if len(content) > 4000:
-            content = content[:4000]
+        # Drop boilerplate and keep whole, informative sentences within the token budget
+        article = get_reduced_article(
+            url,
+            f"budget:{BLOG_CONTENT_TOKENS}",
+            lambda content: fit_to_budget(content, BLOG_CONTENT_TOKENS),
+            last_modified
+        )
+        if not article:
+            logger.warning(f"No article content found at {url}")
+            return None
         
         return {
-            'title': title,
-            'content': content,
+            'title': article['title'] or "Untitled",
+            'content': article['content'],
             'url': url
         }
     
@@ -4,6 +4,7 @@ Uses Runway AI to generate relevant images for LinkedIn content
 """
 
 import requests
+import http_client
 import logging
 import os
 import time
@@ -65,7 +66,7 @@ class LinkedInImageGenerator:
                 "guidance_scale": 7.5
             }
             
-            response = requests.post(
+            response = http_client.post(
                 f"{RUNWAY_API_BASE}/image_generation",
                 headers=self.headers,
                 json=payload,
@@ -151,7 +152,7 @@ Style: Professional corporate, modern, clean, trustworthy"""
         try:
             logger.info(f"Downloading image to {filename}")
             
-            response = requests.get(image_url, timeout=30)
+            response = http_client.get(image_url, timeout=30)
             
             if response.status_code == 200:
                 with open(filename, 'wb') as f:
@@ -0,0 +1,94 @@
+"""
+Durable per-post job table for the LinkedIn pipeline
+Checkpoints each blog post after every stage (fetch, generate, image, publish) so a
+restarted or repeated run resumes unfinished work and never re-publishes a post
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+JOB_STORE_FILE = 'linkedin_jobs.db'
+
+IN_PROGRESS = 'in_progress'
+# Handed to the rate limiter's retry queue, which publishes it on a later run
+QUEUED = 'queued'
+PUBLISHED = 'published'
+# Generated text matched something already posted
+SKIPPED = 'skipped'
+
+
+class JobStore:
+    """SQLite table of blog-post jobs keyed by blog URL"""
+
+    def __init__(self, path=JOB_STORE_FILE):
+        self._lock = threading.Lock()
+        self.resumed = 0
+        self.skipped = 0
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS jobs (
+                url TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                data TEXT NOT NULL,
+                post_id TEXT,
+                updated_at TEXT NOT NULL
+            )"""
+        )
+        self.conn.commit()
+
+    def resume(self, post):
+        """
+        Return the job dict to run for a scraped blog post, or None to skip it.
+
+        A post seen before comes back with its saved stage outputs and the
+        names of the stages already done (job['done']); a finished post
+        returns None.
+        """
+        with self._lock:
+            row = self.conn.execute("SELECT status, data FROM jobs WHERE url = ?", (post['url'],)).fetchone()
+
+        if row is None:
+            return {'post': post, 'done': []}
+
+        status, data = row
+        if status != IN_PROGRESS:
+            self.skipped += 1
+            logger.info(f"Already {status}, skipping: {post['title']}")
+            return None
+
+        job = json.loads(data)
+        job['post'] = post
+        self.resumed += 1
+        logger.info(f"Resuming after {', '.join(job['done']) or 'no'} stages: {post['title']}")
+        return job
+
+    def checkpoint(self, stage, job):
+        """Record that stage finished for job, along with everything the job holds so far"""
+        job['done'] = job.get('done', []) + [stage]
+        self._save(job['post']['url'], IN_PROGRESS, job)
+
+    def finish(self, url, status, post_id=None):
+        """Mark a job PUBLISHED, QUEUED or SKIPPED so later runs leave it alone"""
+        with self._lock:
+            self.conn.execute(
+                "UPDATE jobs SET status = ?, post_id = ?, updated_at = ? WHERE url = ?",
+                (status, post_id, datetime.now().isoformat(), url)
+            )
+            self.conn.commit()
+
+    def _save(self, url, status, job):
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO jobs (url, status, data, post_id, updated_at) VALUES (?, ?, ?, NULL, ?)",
+                (url, status, json.dumps(job), datetime.now().isoformat())
+            )
+            self.conn.commit()
+
+    def stats(self):
+        """One-line summary for end-of-run reporting"""
+        return f"Job store: {self.resumed} resumed, {self.skipped} already done"
@@ -5,6 +5,7 @@ Generates engaging LinkedIn posts optimized for GEO/AEO with blog snippets and V
 
 import logging
 from openai import OpenAI
+from llm_cache import cached_chat_completion
 
 logging.basicConfig(
     level=logging.INFO,
@@ -79,7 +80,8 @@ Generate ONLY the post text, nothing else. Keep it under 1300 characters."""
 
 Generate ONLY the post text, nothing else. Keep it under 1300 characters."""
         
-        response = client.chat.completions.create(
+        post_text = cached_chat_completion(
+            client,
             model="gpt-4.1-mini",
             messages=[
                 {
@@ -89,9 +91,7 @@ Generate ONLY the post text, nothing else. Keep it under 1300 characters."""
             ],
             temperature=0.7,
             max_tokens=400
-        )
-        
-        post_text = response.choices[0].message.content.strip()
+        ).strip()
         
         # Ensure it's under the limit
         if len(post_text) > LINKEDIN_OPTIMAL:
@@ -155,7 +155,8 @@ Blog URL to include: {blog_url}
 
 Generate ONLY the post text. Keep it under 1200 characters."""
         
-        response = client.chat.completions.create(
+        post_text = cached_chat_completion(
+            client,
             model="gpt-4.1-mini",
             messages=[
                 {
@@ -165,9 +166,7 @@ Generate ONLY the post text. Keep it under 1200 characters."""
             ],
             temperature=0.7,
             max_tokens=400
-        )
-        
-        post_text = response.choices[0].message.content.strip()
+        ).strip()
         
         # Ensure it's under the limit
         if len(post_text) > LINKEDIN_OPTIMAL:
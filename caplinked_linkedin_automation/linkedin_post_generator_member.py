@@ -6,6 +6,7 @@ Optimized for GEO/AEO with blog snippets and VDR/M&A focus
 
 import logging
 from openai import OpenAI
+from llm_cache import cached_chat_completion
 
 logging.basicConfig(
     level=logging.INFO,
@@ -82,7 +83,8 @@ Generate ONLY the post text, nothing else. Keep it under 1100 characters. Includ
 
 Generate ONLY the post text, nothing else. Keep it under 1100 characters. Include "CapLinked" in the post."""
         
-        response = client.chat.completions.create(
+        post_text = cached_chat_completion(
+            client,
             model="gpt-4.1-mini",
             messages=[
                 {
@@ -92,9 +94,7 @@ Generate ONLY the post text, nothing else. Keep it under 1100 characters. Includ
             ],
             temperature=0.7,
             max_tokens=400
-        )
-        
-        post_text = response.choices[0].message.content.strip()
+        ).strip()
         
         # Ensure it's under the limit
         if len(post_text) > LINKEDIN_OPTIMAL:
@@ -160,7 +160,8 @@ Blog URL to include: {blog_url}
 
 Generate ONLY the post text. Keep it under 1100 characters. Include "CapLinked" in the post."""
         
-        response = client.chat.completions.create(
+        post_text = cached_chat_completion(
+            client,
             model="gpt-4.1-mini",
             messages=[
                 {
@@ -170,9 +171,7 @@ Generate ONLY the post text. Keep it under 1100 characters. Include "CapLinked"
             ],
             temperature=0.7,
             max_tokens=400
-        )
-        
-        post_text = response.choices[0].message.content.strip()
+        ).strip()
         
         # Ensure it's under the limit
         if len(post_text) > LINKEDIN_OPTIMAL:
@@ -4,6 +4,8 @@ Posts generated content to CapLinked company page automatically
 """
 
 import requests
+import http_client
+from rate_limiter import RateLimitedError, limited_request
 import json
 import logging
 import os
@@ -137,14 +139,14 @@ class LinkedInPoster:
         
         try:
             if method == "POST":
-                response = requests.post(
+                send = lambda: http_client.post(
                     url,
                     headers=self.headers,
                     json=data,
                     timeout=30
                 )
             elif method == "GET":
-                response = requests.get(
+                send = lambda: http_client.get(
                     url,
                     headers=self.headers,
                     timeout=30
@@ -153,6 +155,9 @@ class LinkedInPoster:
                 logger.error(f"Unsupported HTTP method: {method}")
                 return None
             
+            # Waits out the endpoint's token bucket and short 429s; raises RateLimitedError on long ones
+            response = limited_request(f"{method} {endpoint}", send)
+            
             # Log response
             logger.info(f"{method} {endpoint} - Status: {response.status_code}")
             
@@ -161,10 +166,6 @@ class LinkedInPoster:
                 logger.info(f"Success: {json.dumps(result, indent=2)}")
                 return result
             
-            elif response.status_code == 429:
-                logger.warning("Rate limited by LinkedIn API")
-                return None
-            
             elif response.status_code == 401:
                 logger.error("Unauthorized - Invalid access token")
                 return None
@@ -177,6 +178,8 @@ class LinkedInPoster:
                 logger.error(f"API Error {response.status_code}: {response.text}")
                 return None
         
+        except RateLimitedError:
+            raise
         except requests.RequestException as e:
             logger.error(f"Request failed: {e}")
             return None
@@ -215,6 +218,8 @@ class LinkedInPoster:
                 logger.error("Failed to get post ID from response")
                 return None
         
+        except RateLimitedError:
+            raise
         except Exception as e:
             logger.error(f"Error posting blog content: {e}")
             return None
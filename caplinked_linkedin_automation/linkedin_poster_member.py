@@ -4,7 +4,8 @@ Posts generated content as member (tracewellgordon) with CapLinked organization
 User can then manually share to CapLinked company page
 """
 
-import requests
+import http_client
+from rate_limiter import RateLimitedError, limited_request
 import json
 import logging
 import os
@@ -147,6 +148,8 @@ class LinkedInMemberPoster:
                 logger.error("Failed to get post ID from response")
                 return None
         
+        except RateLimitedError:
+            raise
         except Exception as e:
             logger.error(f"Error posting blog content: {e}")
             return None
@@ -173,14 +176,14 @@ class LinkedInMemberPoster:
             logger.debug(f"Payload: {json.dumps(data, indent=2) if data else 'None'}")
             
             if method == "POST":
-                response = requests.post(
+                send = lambda: http_client.post(
                     url,
                     headers=self.headers,
                     json=data,
                     timeout=30
                 )
             elif method == "GET":
-                response = requests.get(
+                send = lambda: http_client.get(
                     url,
                     headers=self.headers,
                     timeout=30
@@ -189,6 +192,9 @@ class LinkedInMemberPoster:
                 logger.error(f"Unsupported HTTP method: {method}")
                 return None
             
+            # Waits out the endpoint's token bucket and short 429s; raises RateLimitedError on long ones
+            response = limited_request(f"{method} {endpoint}", send)
+            
             # Log response
             logger.info(f"{method} {endpoint} - Status: {response.status_code}")
             
@@ -197,10 +203,6 @@ class LinkedInMemberPoster:
                 logger.info(f"Success: {json.dumps(result, indent=2)}")
                 return result
             
-            elif response.status_code == 429:
-                logger.warning("Rate limited by LinkedIn API")
-                return None
-            
             elif response.status_code == 401:
                 logger.error("Unauthorized - Invalid access token")
                 return None
@@ -213,6 +215,8 @@ class LinkedInMemberPoster:
                 logger.error(f"API Error {response.status_code}: {response.text}")
                 return None
         
+        except RateLimitedError:
+            raise
         except Exception as e:
             logger.error(f"Request failed: {e}")
             return None
@@ -4,6 +4,8 @@ Posts generated content to CapLinked company page automatically with images
 """
 
 import requests
+import http_client
+from rate_limiter import RateLimitedError, limited_request
 import json
 import logging
 import os
@@ -49,7 +51,7 @@ class LinkedInPoster:
     def _fetch_member_id(self):
         """Fetch authenticated member ID from LinkedIn API"""
         try:
-            response = requests.get(
+            response = http_client.get(
                 f"{LINKEDIN_API_BASE}/me",
                 headers=self.headers,
                 timeout=10
@@ -170,14 +172,14 @@ class LinkedInPoster:
         
         try:
             if method == "POST":
-                response = requests.post(
+                send = lambda: http_client.post(
                     url,
                     headers=self.headers,
                     json=data,
                     timeout=30
                 )
             elif method == "GET":
-                response = requests.get(
+                send = lambda: http_client.get(
                     url,
                     headers=self.headers,
                     timeout=30
@@ -186,6 +188,9 @@ class LinkedInPoster:
                 logger.error(f"Unsupported HTTP method: {method}")
                 return None
             
+            # Waits out the endpoint's token bucket and short 429s; raises RateLimitedError on long ones
+            response = limited_request(f"{method} {endpoint}", send)
+            
             # Log response
             logger.info(f"{method} {endpoint} - Status: {response.status_code}")
             
@@ -194,10 +199,6 @@ class LinkedInPoster:
                 logger.info(f"Success: {json.dumps(result, indent=2)}")
                 return result
             
-            elif response.status_code == 429:
-                logger.warning("Rate limited by LinkedIn API")
-                return None
-            
             elif response.status_code == 401:
                 logger.error("Unauthorized - Invalid access token")
                 return None
@@ -213,6 +214,8 @@ class LinkedInPoster:
                 logger.error(f"API Error {response.status_code}: {error_msg}")
                 return None
         
+        except RateLimitedError:
+            raise
         except requests.exceptions.Timeout:
             logger.error("Request timeout")
             return None
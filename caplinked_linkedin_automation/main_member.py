@@ -5,12 +5,12 @@ User can then manually share to CapLinked company page
 """
 
 import logging
-import json
 import os
 from datetime import datetime
-from blog_scraper import scrape_blog_posts, get_blog_content
+from blog_scraper import scrape_blog_posts
 from linkedin_post_generator_member import generate_post_with_blog_link_and_mention
 from linkedin_poster_member import LinkedInMemberPoster, get_linkedin_credentials
+from post_pipeline import run_blog_posts
 
 logging.basicConfig(
     level=logging.DEBUG,
@@ -22,6 +22,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Append-only history of every posting attempt, one JSON record per line
+RESULTS_FILE = 'linkedin_posts.jsonl'
+
 def run_linkedin_automation():
     """
     Main automation pipeline - posts as member with CapLinked mention
@@ -46,73 +49,33 @@ def run_linkedin_automation():
     blog_posts = scrape_blog_posts(limit=2)  # Get 2 posts per day
     
     if not blog_posts:
-        logger.warning("No blog posts found")
-        return False
+        # Keep going: posts throttled on an earlier run may still be due
+        logger.warning("No new blog posts found")
     
     logger.info(f"Found {len(blog_posts)} blog posts")
     
-    # Track posted content
-    posted_content = []
+    def generate(post):
+        logger.info(f"Step 2: Generating LinkedIn post with CapLinked mention for: {post['title']}")
+        return generate_post_with_blog_link_and_mention(
+            blog_title=post['title'],
+            blog_excerpt=post['excerpt'],
+            blog_url=post['url']
+        )
     
-    # Process each blog post
-    for i, post in enumerate(blog_posts, 1):
-        try:
-            logger.info(f"\nProcessing post {i}/{len(blog_posts)}: {post['title']}")
-            
-            # Get full blog content
-            blog_content = get_blog_content(post['url'])
-            
-            if not blog_content:
-                logger.warning(f"Could not fetch full content for {post['title']}")
-                continue
-            
-            # Generate LinkedIn post with CapLinked mention
-            logger.info("Step 2: Generating LinkedIn post with CapLinked mention...")
-            linkedin_post = generate_post_with_blog_link_and_mention(
-                blog_title=post['title'],
-                blog_excerpt=post['excerpt'],
-                blog_url=post['url']
-            )
-            
-            if not linkedin_post:
-                logger.warning(f"Failed to generate post for {post['title']}")
-                continue
-            
-            logger.info(f"Generated post ({len(linkedin_post)} chars):\n{linkedin_post}\n")
-            
-            # Post to LinkedIn as member with link
-            logger.info("Step 3: Posting to LinkedIn as member...")
-            post_id = poster.post_blog_content(
-                blog_title=post['title'],
-                post_text=linkedin_post,
-                blog_url=post['url']
-            )
-            
-            if post_id:
-                posted_content.append({
-                    "blog_title": post['title'],
-                    "blog_url": post['url'],
-                    "linkedin_post": linkedin_post,
-                    "post_id": post_id,
-                    "timestamp": datetime.now().isoformat(),
-                    "status": "SUCCESS",
-                    "next_action": "Manually share to CapLinked company page"
-                })
-                logger.info(f"Successfully posted to LinkedIn: {post_id}")
-                logger.info("Next: Manually share this post to CapLinked company page")
-            else:
-                posted_content.append({
-                    "blog_title": post['title'],
-                    "blog_url": post['url'],
-                    "linkedin_post": linkedin_post,
-                    "timestamp": datetime.now().isoformat(),
-                    "status": "FAILED"
-                })
-                logger.error(f"Failed to post {post['title']} to LinkedIn")
-        
-        except Exception as e:
-            logger.error(f"Error processing post {i}: {e}")
-            continue
+    def publish(item):
+        # Post to LinkedIn as member with link
+        logger.info(f"Step 3: Posting to LinkedIn as member: {item['blog_title']}")
+        return poster.post_blog_content(
+            blog_title=item['blog_title'],
+            post_text=item['linkedin_post'],
+            blog_url=item['blog_url']
+        )
+    
+    def on_published(record):
+        record["next_action"] = "Manually share to CapLinked company page"
+        logger.info("Next: Manually share this post to CapLinked company page")
+    
+    posted_content, stats = run_blog_posts(blog_posts, generate, publish, RESULTS_FILE, on_published=on_published)
     
     # Save results
     logger.info("\nStep 4: Saving results...")
@@ -120,6 +83,8 @@ def run_linkedin_automation():
     
     logger.info("="*80)
     logger.info("LinkedIn Automation Complete")
+    for line in stats:
+        logger.info(line)
     logger.info(f"Posted {len([p for p in posted_content if p['status'] == 'SUCCESS'])} posts to your profile")
     logger.info("Remember: Manually share these posts to CapLinked company page for maximum visibility")
     logger.info("="*80)
@@ -136,12 +101,7 @@ def save_results(posted_content):
     """
     
     try:
-        # Save as JSON
-        with open('linkedin_posts.json', 'w') as f:
-            json.dump(posted_content, f, indent=2)
-        logger.info("Saved results to linkedin_posts.json")
-        
-        # Save as human-readable log
+        # Records are already in RESULTS_FILE; add the human-readable log
         with open('linkedin_posting_log.txt', 'a') as f:
             f.write(f"\n{'='*80}\n")
             f.write(f"Posting Run: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
@@ -0,0 +1,228 @@
+"""
+Staged processing pipeline for LinkedIn automation
+Runs the per-post preparation stages (fetch, generate, image) concurrently in worker pools
+and hands finished posts to a single publisher; run_blog_posts() is the whole per-run flow
+shared by every LinkedIn entry point
+"""
+
+import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from blog_scraper import get_blog_content, mark_blog_posts_seen
+from rate_limiter import RetryQueue
+from job_store import JobStore, PUBLISHED, QUEUED, SKIPPED
+from posted_index import PostedIndex
+from results_store import ResultsStore
+from llm_cache import cache_stats
+from http_cache import cache_stats as http_cache_stats
+from blog_corpus import get_corpus
+
+logger = logging.getLogger(__name__)
+
+# Workers per preparation stage
+STAGE_WORKERS = 4
+
+_DONE = object()
+
+
+class StagedPipeline:
+    """
+    Push items through a sequence of stages, each backed by its own thread pool.
+
+    A stage is a (name, func) pair; func takes the job dict and returns it
+    (possibly updated) to pass it on, or None to drop it. Exceptions are logged
+    and drop the job. Different jobs occupy different stages at the same time,
+    so total time approaches that of the slowest single job.
+
+    With a checkpoint callback, checkpoint(name, job) is called after each stage
+    a job clears, and stages listed in job['done'] are skipped, so jobs restored
+    from a JobStore pick up where an earlier run left off.
+    """
+
+    def __init__(self, stages, workers_per_stage=STAGE_WORKERS, checkpoint=None):
+        self.stages = stages
+        self.workers_per_stage = workers_per_stage
+        self.checkpoint = checkpoint
+
+    def run(self, jobs):
+        """Yield each job that clears every stage, as soon as it does"""
+        jobs = list(jobs)
+        if not jobs:
+            return
+
+        finished = queue.Queue()
+        pending = [len(jobs)]
+        lock = threading.Lock()
+        pools = [ThreadPoolExecutor(max_workers=self.workers_per_stage) for _ in self.stages]
+
+        def settle(job):
+            finished.put(job)
+            with lock:
+                pending[0] -= 1
+                if pending[0] == 0:
+                    finished.put(_DONE)
+
+        def run_stage(index, job):
+            name, func = self.stages[index]
+            try:
+                if name not in job.get('done', ()):
+                    job = func(job)
+                    if job is not None and self.checkpoint:
+                        self.checkpoint(name, job)
+            except Exception as e:
+                logger.error(f"Stage '{name}' failed: {e}")
+                job = None
+
+            if job is None:
+                settle(None)
+            elif index + 1 < len(self.stages):
+                pools[index + 1].submit(run_stage, index + 1, job)
+            else:
+                settle(job)
+
+        try:
+            for job in jobs:
+                pools[0].submit(run_stage, 0, job)
+
+            while True:
+                job = finished.get()
+                if job is _DONE:
+                    break
+                if job is not None:
+                    yield job
+        finally:
+            for pool in pools:
+                pool.shutdown(wait=True)
+
+
+def run_blog_posts(blog_posts, generate, publish, results_file, image=None, on_published=None):
+    """
+    Turn blog posts into LinkedIn posts and publish each one as soon as it is ready
+    
+    Posts throttled on an earlier run are retried first. Then every post not
+    already published is fetched, generated and (with image) illustrated
+    concurrently, resuming after whatever stages an earlier run finished, and
+    published one at a time. Every attempt is appended to results_file, and
+    the blog feed mark is advanced past the posts this run got through.
+    
+    Args:
+        blog_posts: Posts from scrape_blog_posts
+        generate: Function of a blog post returning the LinkedIn post text, or None
+        publish: Function of an item (blog_title, blog_url, linkedin_post and,
+            with image, image_url) returning the LinkedIn post ID
+        results_file: JSONL history the posting records are appended to
+        image: Optional function of a blog post returning an image URL, or None
+        on_published: Optional function called with each successful record
+    
+    Returns:
+        Tuple of (posting records, end-of-run statistics lines)
+    """
+    posted_content = []
+    # URLs of blog posts done with: published, queued, skipped, or already handled on an earlier run
+    finished = set()
+    job_store = JobStore()
+    posted_index = PostedIndex()
+    # Every record is appended to the JSONL history as soon as its publish attempt ends
+    results = ResultsStore(results_file, url_field='blog_url')
+    
+    def fetch_content(job):
+        post = job['post']
+        logger.info(f"Fetching full content: {post['title']}")
+        job['blog_content'] = get_blog_content(post['url'], post.get('published'))
+        if not job['blog_content']:
+            logger.warning(f"Could not fetch full content for {post['title']}")
+            return None
+        # Same article under another URL: drop it before spending an LLM call
+        if posted_index.is_duplicate(post['url'], post['title'], job['blog_content'].get('content'), 'content'):
+            finished.add(post['url'])
+            return None
+        return job
+    
+    def generate_post(job):
+        post = job['post']
+        job['linkedin_post'] = generate(post)
+        if not job['linkedin_post']:
+            logger.warning(f"Failed to generate post for {post['title']}")
+            return None
+        logger.info(f"Generated post ({len(job['linkedin_post'])} chars):\n{job['linkedin_post']}\n")
+        return job
+    
+    def generate_image(job):
+        job['image_url'] = image(job['post'])
+        return job
+    
+    # Fetch, generate (and image) all posts concurrently; publish one at a time as each is ready
+    stages = [("fetch", fetch_content), ("generate", generate_post)]
+    if image:
+        stages.append(("image", generate_image))
+    pipeline = StagedPipeline(stages, checkpoint=job_store.checkpoint)
+    retry_queue = RetryQueue()
+    
+    def publish_and_record(item, entry_id=None, content=None):
+        status, post_id = retry_queue.attempt(item, publish, entry_id)
+        record = {**item, "timestamp": datetime.now().isoformat(), "status": status}
+        if status == "SUCCESS":
+            job_store.finish(item['blog_url'], PUBLISHED, post_id)
+            finished.add(item['blog_url'])
+            posted_index.record(item['blog_url'], item['blog_title'], item['linkedin_post'], content)
+            record["post_id"] = post_id
+            logger.info(f"Successfully posted to LinkedIn: {post_id}")
+            if on_published:
+                on_published(record)
+        elif status == "QUEUED":
+            job_store.finish(item['blog_url'], QUEUED)
+            finished.add(item['blog_url'])
+        elif status == "FAILED":
+            logger.error(f"Failed to post {item['blog_title']} to LinkedIn")
+        posted_content.append(record)
+        results.append(record)
+    
+    # Posts throttled on an earlier run go out first, once their back-off has passed
+    for entry_id, item in retry_queue.due():
+        logger.info(f"Retrying throttled post: {item['blog_title']}")
+        try:
+            publish_and_record(item, entry_id)
+        except Exception as e:
+            logger.error(f"Error publishing {item['blog_title']}: {e}")
+    
+    # Posts seen on an earlier run resume after their last finished stage; published ones are skipped
+    new_posts = [post for post in blog_posts if not posted_index.is_duplicate(post['url'], post['title'])]
+    jobs = [job for job in (job_store.resume(post) for post in new_posts) if job]
+    finished.update(post['url'] for post in blog_posts)
+    finished.difference_update(job['post']['url'] for job in jobs)
+    
+    for job in pipeline.run(jobs):
+        post = job['post']
+        if posted_index.is_duplicate(post['url'], post['title'], job['linkedin_post'], 'post'):
+            job_store.finish(post['url'], SKIPPED)
+            finished.add(post['url'])
+            continue
+        item = {
+            "blog_title": post['title'],
+            "blog_url": post['url'],
+            "linkedin_post": job['linkedin_post']
+        }
+        if image:
+            item["image_url"] = job['image_url']
+        try:
+            publish_and_record(item, content=job['blog_content'].get('content'))
+        except Exception as e:
+            logger.error(f"Error publishing {post['title']}: {e}")
+            continue
+    
+    results.close()
+    # A post that failed anywhere holds the feed mark back, so the next run retries it
+    mark_blog_posts_seen(finished)
+    
+    stats = [
+        cache_stats(),
+        http_cache_stats(),
+        get_corpus().stats(),
+        job_store.stats(),
+        posted_index.stats(),
+        f"{retry_queue.pending_count()} throttled posts queued for a later run",
+    ]
+    return posted_content, stats
@@ -0,0 +1,119 @@
+"""
+Cross-run index of content already posted to LinkedIn
+Keyed by normalized blog URL, with SimHash fingerprints of the article text and of the
+generated post so the same story is caught even under a different URL or wording
+"""
+
+import hashlib
+import logging
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+logger = logging.getLogger(__name__)
+
+POSTED_INDEX_FILE = 'linkedin_posted.db'
+
+# Fingerprints within this many differing bits (of 64) count as the same content
+SIMHASH_MAX_DISTANCE = 3
+
+# Words per shingle when fingerprinting
+SHINGLE_SIZE = 3
+
+_TRACKING_PARAMS = re.compile(r'^(utm_\w+|fbclid|gclid|mc_cid|mc_eid|ref)$', re.IGNORECASE)
+_WORD = re.compile(r'\w+')
+
+
+def normalize_url(url):
+    """Canonical form of a blog URL: lowercase host without www, no fragment, tracking params or trailing slash"""
+    parts = urlparse(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query) if not _TRACKING_PARAMS.match(k)))
+    path = parts.path.rstrip('/') or '/'
+    return urlunparse(('https', host, path, '', query, ''))
+
+
+def simhash(text):
+    """64-bit SimHash of text over word shingles"""
+    words = _WORD.findall(text.lower())
+    shingles = [' '.join(words[i:i + SHINGLE_SIZE]) for i in range(max(1, len(words) - SHINGLE_SIZE + 1))]
+    weights = [0] * 64
+    for shingle in shingles:
+        h = int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big')
+        for bit in range(64):
+            weights[bit] += 1 if h >> bit & 1 else -1
+    return sum(1 << bit for bit in range(64) if weights[bit] > 0)
+
+
+def hamming_distance(a, b):
+    return bin(a ^ b).count('1')
+
+
+class PostedIndex:
+    """SQLite record of every blog post published to LinkedIn, across runs and entry points"""
+
+    def __init__(self, path=POSTED_INDEX_FILE):
+        self._lock = threading.Lock()
+        self.duplicates = 0
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS posted (
+                url_key TEXT PRIMARY KEY,
+                title TEXT,
+                content_hash TEXT,
+                post_hash TEXT,
+                posted_at TEXT NOT NULL
+            )"""
+        )
+        self.conn.commit()
+
+    def has_url(self, url):
+        with self._lock:
+            return self.conn.execute(
+                "SELECT 1 FROM posted WHERE url_key = ?", (normalize_url(url),)
+            ).fetchone() is not None
+
+    def near_duplicate(self, text, kind):
+        """
+        Return the title of an already-posted item whose fingerprint is close to text's, or None.
+
+        kind is 'content' to compare against article text, or 'post' to
+        compare against previously published LinkedIn post text.
+        """
+        if not text:
+            return None
+        column = {'content': 'content_hash', 'post': 'post_hash'}[kind]
+        fingerprint = simhash(text)
+        with self._lock:
+            rows = self.conn.execute(f"SELECT title, {column} FROM posted WHERE {column} IS NOT NULL").fetchall()
+        for title, stored in rows:
+            if hamming_distance(fingerprint, int(stored, 16)) <= SIMHASH_MAX_DISTANCE:
+                return title
+        return None
+
+    def is_duplicate(self, url, title, text=None, kind='content'):
+        """Check the URL, then (if given) the text fingerprint; logs and counts a hit"""
+        match = title if self.has_url(url) else self.near_duplicate(text, kind)
+        if match is None:
+            return False
+        self.duplicates += 1
+        logger.info(f"Skipping '{title}': already posted as '{match}'")
+        return True
+
+    def record(self, url, title, post_text, content=None):
+        """Remember a published post"""
+        content_hash = f"{simhash(content):016x}" if content else None
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO posted (url_key, title, content_hash, post_hash, posted_at) VALUES (?, ?, ?, ?, ?)",
+                (normalize_url(url), title, content_hash, f"{simhash(post_text):016x}", datetime.now().isoformat())
+            )
+            self.conn.commit()
+
+    def stats(self):
+        """One-line summary for end-of-run reporting"""
+        return f"Posted index: {self.duplicates} duplicates skipped"
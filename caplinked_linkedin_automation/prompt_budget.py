@@ -0,0 +1,149 @@
+"""
+Token-aware prompt budgeting
+Strips page boilerplate and keeps the most informative whole sentences of a text that fit a
+token budget, counted with the model's own tokenizer when tiktoken is installed
+"""
+
+import math
+import re
+from collections import Counter
+
+# Exact counts with tiktoken; should it be missing, ~4 characters per token
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+DEFAULT_MODEL = "gpt-4.1-mini"
+
+_encodings = {}
+
+_SENTENCE_END = re.compile(r'(?<=[.!?])["”\')\]]*\s+(?=["“(\[]?[A-Z0-9])')
+_WORD = re.compile(r"[a-z0-9][a-z0-9'&-]*")
+
+# Sentences from navigation, sharing widgets, footers and calls to action rather than the article
+BOILERPLATE = re.compile(
+    r"\b(share (this|on)|follow us|subscribe|sign up|newsletter|read more|continue reading|"
+    r"related (posts|articles)|leave a (comment|reply)|click here|cookie|privacy policy|"
+    r"terms of (use|service)|all rights reserved|copyright|skip to content|back to top|"
+    r"posted (in|by)|previous post|next post)\b|\b(tags?|categories):",
+    re.IGNORECASE,
+)
+
+# Fragments shorter than this many words (menu items, captions, bylines) are dropped
+MIN_SENTENCE_WORDS = 4
+
+STOPWORDS = frozenset("""
+a about above after again all also am an and any are as at be because been before being below
+between both but by can could did do does doing down during each few for from further had has
+have having he her here hers him his how i if in into is it its itself just me more most my no
+nor not now of off on once only or other our ours out over own same she should so some such than
+that the their theirs them then there these they this those through to too under until up very
+was we were what when where which while who whom why will with would you your yours
+""".split())
+
+
+def _encoding(model):
+    if tiktoken is None:
+        return None
+    if model not in _encodings:
+        try:
+            try:
+                _encodings[model] = tiktoken.encoding_for_model(model)
+            except KeyError:
+                _encodings[model] = tiktoken.get_encoding("o200k_base")
+        except Exception:
+            # The encoding files are downloaded on first use; offline, fall back to the estimate
+            _encodings[model] = None
+    return _encodings[model]
+
+
+def count_tokens(text, model=DEFAULT_MODEL):
+    """Tokens text costs for model"""
+    encoding = _encoding(model)
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return math.ceil(len(text) / 4)
+
+
+def split_sentences(text):
+    return [s.strip() for s in _SENTENCE_END.split(' '.join(text.split())) if s.strip()]
+
+
+def strip_boilerplate(sentences):
+    """Drop navigation/footer sentences, short fragments and repeats, keeping order"""
+    kept = []
+    seen = set()
+    for sentence in sentences:
+        key = sentence.lower()
+        if key in seen or len(sentence.split()) < MIN_SENTENCE_WORDS or BOILERPLATE.search(sentence):
+            continue
+        seen.add(key)
+        kept.append(sentence)
+    return kept
+
+
+def _informativeness(sentences):
+    """
+    Score each sentence by how much of the document's recurring vocabulary it carries.
+
+    Content words are weighted by their frequency across the whole text, so
+    sentences about the main topic outrank asides; the sum is divided by the
+    square root of the sentence length so long sentences don't win by size
+    alone. The opening sentence and sentences with figures get a small boost.
+    """
+    words = [[w for w in _WORD.findall(s.lower()) if w not in STOPWORDS] for s in sentences]
+    frequency = Counter(w for sentence_words in words for w in set(sentence_words))
+    scores = []
+    for i, sentence_words in enumerate(words):
+        if not sentence_words:
+            scores.append(0.0)
+            continue
+        score = sum(frequency[w] - 1 for w in set(sentence_words)) / math.sqrt(len(sentence_words))
+        if i == 0:
+            score *= 1.5
+        if any(c.isdigit() for c in sentences[i]):
+            score *= 1.2
+        scores.append(score)
+    return scores
+
+
+def _truncate_words(text, max_tokens, model):
+    words = text.split()
+    low, high = 0, len(words)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if count_tokens(' '.join(words[:middle]), model) <= max_tokens:
+            low = middle
+        else:
+            high = middle - 1
+    return ' '.join(words[:low])
+
+
+def fit_to_budget(text, max_tokens, model=DEFAULT_MODEL):
+    """
+    Return the informative part of text in at most max_tokens tokens for model.
+
+    Boilerplate is stripped first; if the rest still doesn't fit, the highest
+    scoring whole sentences that fit are kept, in their original order. Only
+    when no single sentence fits is the best one cut at a word boundary.
+    """
+    if not text:
+        return text
+    sentences = strip_boilerplate(split_sentences(text)) or split_sentences(text)
+    cleaned = ' '.join(sentences)
+    if count_tokens(cleaned, model) <= max_tokens:
+        return cleaned
+
+    scores = _informativeness(sentences)
+    chosen = []
+    used = 0
+    for i in sorted(range(len(sentences)), key=lambda i: scores[i], reverse=True):
+        cost = count_tokens(sentences[i], model) + 1
+        if used + cost <= max_tokens:
+            chosen.append(i)
+            used += cost
+    if not chosen:
+        best = max(range(len(sentences)), key=lambda i: scores[i])
+        return _truncate_words(sentences[best], max_tokens, model)
+    return ' '.join(sentences[i] for i in sorted(chosen))
@@ -0,0 +1,288 @@
+"""
+Rate limiting for the LinkedIn API
+Per-endpoint token buckets that honour Retry-After and X-RateLimit-* headers,
+plus a durable SQLite retry queue so throttled posts are rescheduled instead of lost
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_DB_FILE = 'linkedin_rate_limits.db'
+
+# (requests per second, burst) per "METHOD /endpoint"; anything else gets the default
+ENDPOINT_LIMITS = {
+    "POST /posts": (1 / 5, 1),
+}
+DEFAULT_LIMIT = (1.0, 5)
+
+# Waits up to this long are absorbed in-process; longer ones park the post in the retry queue
+MAX_INLINE_WAIT_SECONDS = 60
+
+# Fallback back-off when a 429 carries no Retry-After
+DEFAULT_RETRY_AFTER_SECONDS = 60
+
+# Short 429s retried in-process before the request is handed back as RateLimitedError
+MAX_INLINE_RETRIES = 3
+
+# A queued post is dropped after this many attempts, throttled or failed
+MAX_QUEUE_ATTEMPTS = 10
+
+# A queued post whose publish fails for another reason is tried again after this long
+FAILED_RETRY_SECONDS = 3600
+
+
+class RateLimitedError(Exception):
+    """Raised when a request can't be made for retry_after seconds"""
+
+    def __init__(self, endpoint, retry_after):
+        super().__init__(f"{endpoint} rate limited for {retry_after:.0f}s")
+        self.endpoint = endpoint
+        self.retry_after = retry_after
+
+
+def _connect(path):
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.executescript(
+        """CREATE TABLE IF NOT EXISTS endpoint_pauses (
+            endpoint TEXT PRIMARY KEY,
+            paused_until REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS retry_queue (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            payload TEXT NOT NULL,
+            not_before REAL NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            created_at TEXT NOT NULL
+        );"""
+    )
+    conn.commit()
+    return conn
+
+
+class TokenBucket:
+    """Classic token bucket with an extra hard pause for server-imposed back-off"""
+
+    def __init__(self, rate, capacity, paused_until=0.0):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.time()
+        self.paused_until = paused_until
+
+    def wait_time(self):
+        """Seconds until a token is available (refills first)"""
+        now = time.time()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        refill_wait = 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+        return max(refill_wait, self.paused_until - now)
+
+    def take(self):
+        self.tokens -= 1
+
+
+class RateLimiter:
+    """Per-endpoint token buckets; server back-off is persisted so the next run honours it too"""
+
+    def __init__(self, path=RATE_LIMIT_DB_FILE):
+        self._lock = threading.Lock()
+        self.conn = _connect(path)
+        self._pauses = dict(self.conn.execute("SELECT endpoint, paused_until FROM endpoint_pauses"))
+        self._buckets = {}
+
+    def _bucket(self, endpoint):
+        if endpoint not in self._buckets:
+            rate, capacity = ENDPOINT_LIMITS.get(endpoint, DEFAULT_LIMIT)
+            self._buckets[endpoint] = TokenBucket(rate, capacity, self._pauses.get(endpoint, 0.0))
+        return self._buckets[endpoint]
+
+    def acquire(self, endpoint, max_wait=MAX_INLINE_WAIT_SECONDS):
+        """Block until endpoint may be called; raise RateLimitedError if that is more than max_wait away"""
+        while True:
+            with self._lock:
+                bucket = self._bucket(endpoint)
+                wait = bucket.wait_time()
+                if wait <= 0:
+                    bucket.take()
+                    return
+            if wait > max_wait:
+                raise RateLimitedError(endpoint, wait)
+            logger.info(f"Rate limiter: waiting {wait:.1f}s for {endpoint}")
+            time.sleep(wait)
+
+    def pause(self, endpoint, seconds):
+        """Stop calling endpoint for seconds, across runs"""
+        until = time.time() + seconds
+        with self._lock:
+            bucket = self._bucket(endpoint)
+            bucket.paused_until = max(bucket.paused_until, until)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO endpoint_pauses (endpoint, paused_until) VALUES (?, ?)",
+                (endpoint, bucket.paused_until)
+            )
+            self.conn.commit()
+        logger.warning(f"Rate limiter: pausing {endpoint} for {seconds:.0f}s")
+
+    def observe(self, endpoint, response):
+        """
+        Update limits from a response.
+
+        Returns the back-off in seconds for a 429 (Retry-After, else the reset
+        time, else DEFAULT_RETRY_AFTER_SECONDS), or None for any other status.
+        A response that reports no remaining quota pauses the endpoint until reset.
+        """
+        headers = response.headers
+        reset = _reset_seconds(headers.get("X-RateLimit-Reset"))
+        remaining = headers.get("X-RateLimit-Remaining")
+
+        if response.status_code == 429:
+            retry_after = _retry_after_seconds(headers.get("Retry-After"))
+            if retry_after is None:
+                retry_after = reset if reset is not None else DEFAULT_RETRY_AFTER_SECONDS
+            self.pause(endpoint, retry_after)
+            return retry_after
+
+        if remaining is not None and remaining.strip() == "0" and reset:
+            self.pause(endpoint, reset)
+        return None
+
+
+def _retry_after_seconds(value):
+    """Retry-After is either delta-seconds or an HTTP date"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        from email.utils import parsedate_to_datetime
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _reset_seconds(value):
+    """X-RateLimit-Reset is seconds from now, or an epoch timestamp (seconds or ms)"""
+    try:
+        reset = float(value)
+    except (TypeError, ValueError):
+        return None
+    if reset > 1e12:
+        reset /= 1000
+    if reset > 1e9:
+        reset -= time.time()
+    return max(0.0, reset)
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    """Return the process-wide limiter, opening its state on first use"""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter()
+        return _limiter
+
+
+def limited_request(endpoint, send):
+    """
+    Issue send() under endpoint's token bucket and return the response.
+
+    A 429 whose back-off fits within MAX_INLINE_WAIT_SECONDS is waited out and
+    retried (up to MAX_INLINE_RETRIES times); anything longer raises
+    RateLimitedError so the caller can reschedule the work.
+    """
+    limiter = get_rate_limiter()
+    for _ in range(MAX_INLINE_RETRIES + 1):
+        limiter.acquire(endpoint)
+        response = send()
+        retry_after = limiter.observe(endpoint, response)
+        if retry_after is None:
+            return response
+        if retry_after > MAX_INLINE_WAIT_SECONDS:
+            break
+        logger.warning(f"Rate limited by LinkedIn API on {endpoint}, retrying in {retry_after:.0f}s")
+    raise RateLimitedError(endpoint, retry_after)
+
+
+class RetryQueue:
+    """Durable queue of posts that were throttled, each with the earliest time to retry it"""
+
+    def __init__(self, path=RATE_LIMIT_DB_FILE):
+        self.conn = _connect(path)
+
+    def due(self):
+        """Return [(entry_id, payload)] for entries whose retry time has come, oldest first"""
+        rows = self.conn.execute(
+            "SELECT id, payload FROM retry_queue WHERE not_before <= ? ORDER BY id", (time.time(),)
+        ).fetchall()
+        return [(entry_id, json.loads(payload)) for entry_id, payload in rows]
+
+    def pending_count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM retry_queue").fetchone()[0]
+
+    def schedule(self, payload, retry_after, entry_id=None):
+        """Queue payload (or re-queue entry_id) for retry_after seconds from now; False once attempts run out"""
+        not_before = time.time() + retry_after
+        if entry_id is None:
+            self.conn.execute(
+                "INSERT INTO retry_queue (payload, not_before, attempts, created_at) VALUES (?, ?, 1, ?)",
+                (json.dumps(payload), not_before, datetime.now().isoformat())
+            )
+            self.conn.commit()
+            return True
+
+        attempts = self.conn.execute("SELECT attempts FROM retry_queue WHERE id = ?", (entry_id,)).fetchone()
+        if attempts and attempts[0] + 1 > MAX_QUEUE_ATTEMPTS:
+            self.remove(entry_id)
+            return False
+        self.conn.execute(
+            "UPDATE retry_queue SET not_before = ?, attempts = attempts + 1 WHERE id = ?",
+            (not_before, entry_id)
+        )
+        self.conn.commit()
+        return True
+
+    def remove(self, entry_id):
+        self.conn.execute("DELETE FROM retry_queue WHERE id = ?", (entry_id,))
+        self.conn.commit()
+
+    def attempt(self, payload, publish, entry_id=None):
+        """
+        Publish payload via publish(payload) and return (status, post_id).
+
+        status is "SUCCESS", "FAILED", or "QUEUED" when the payload was
+        (re)scheduled for a later run: the API throttled the request, or an
+        already queued entry failed again. A queued entry is only dropped once
+        it succeeds or MAX_QUEUE_ATTEMPTS run out, since no later run would
+        rediscover its post.
+        """
+        try:
+            post_id = publish(payload)
+        except RateLimitedError as e:
+            if self.schedule(payload, e.retry_after, entry_id):
+                logger.warning(f"Throttled; queued for retry in {e.retry_after:.0f}s: {payload.get('blog_title')}")
+                return "QUEUED", None
+            logger.error(f"Giving up after {MAX_QUEUE_ATTEMPTS} attempts: {payload.get('blog_title')}")
+            return "FAILED", None
+
+        if post_id:
+            if entry_id is not None:
+                self.remove(entry_id)
+            return "SUCCESS", post_id
+        if entry_id is not None:
+            if self.schedule(payload, FAILED_RETRY_SECONDS, entry_id):
+                logger.warning(f"Publish failed; queued for retry in {FAILED_RETRY_SECONDS}s: {payload.get('blog_title')}")
+                return "QUEUED", None
+            logger.error(f"Giving up after {MAX_QUEUE_ATTEMPTS} attempts: {payload.get('blog_title')}")
+        return "FAILED", None
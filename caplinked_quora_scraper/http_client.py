@@ -0,0 +1,77 @@
+"""
+Shared HTTP client
+One keep-alive session per process, with per-host connection pools, default timeouts
+and a common retry policy, so repeated calls to a host reuse TCP/TLS connections
+"""
+
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# HTTP/2 is used when the optional h2 package is installed (urllib3 >= 2.3 negotiates it via ALPN)
+try:
+    import h2  # noqa: F401
+    import urllib3.http2
+    urllib3.http2.inject_into_urllib3()
+    HTTP2_ENABLED = True
+except ImportError:
+    HTTP2_ENABLED = False
+
+# (connect, read) seconds, applied when a caller does not pass its own timeout
+DEFAULT_TIMEOUT = (10, 30)
+
+# Distinct hosts kept in the pool, and open connections kept per host
+POOL_HOSTS = 16
+POOL_CONNECTIONS_PER_HOST = 32
+
+# Idempotent requests are retried on connection errors and gateway failures; POSTs never
+# are, so a LinkedIn post or Runway job can't be submitted twice
+RETRY_POLICY = Retry(
+    total=3,
+    backoff_factor=0.5,
+    status_forcelist=(502, 503, 504),
+    allowed_methods=frozenset({"GET", "HEAD", "OPTIONS"}),
+    respect_retry_after_header=True,
+    raise_on_status=False,
+)
+
+
+class PooledSession(requests.Session):
+    """requests.Session with pooled adapters and a default timeout"""
+
+    def __init__(self):
+        super().__init__()
+        adapter = HTTPAdapter(
+            pool_connections=POOL_HOSTS,
+            pool_maxsize=POOL_CONNECTIONS_PER_HOST,
+            max_retries=RETRY_POLICY,
+        )
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+        return super().request(method, url, **kwargs)
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """Return the process-wide pooled session, creating it on first use"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = PooledSession()
+        return _session
+
+
+def get(url, **kwargs):
+    return get_session().get(url, **kwargs)
+
+
+def post(url, **kwargs):
+    return get_session().post(url, **kwargs)
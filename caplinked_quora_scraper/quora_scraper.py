@@ -1,6 +1,8 @@
 import requests
-from bs4 import BeautifulSoup
+import http_client
 import time
+from itertools import islice
+from html_extract import iter_elements
 
 QUORA_SEARCH_URL = "https://www.quora.com/search"
 
@@ -11,14 +13,12 @@ def scrape_quora_questions(query, limit=5 ):
         headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
         }
-        response = requests.get(QUORA_SEARCH_URL, params=params, headers=headers, timeout=15)
+        response = http_client.get(QUORA_SEARCH_URL, params=params, headers=headers, timeout=15)
         response.raise_for_status()
-        soup = BeautifulSoup(response.text, "html.parser")
-        questions = soup.find_all("a", class_="q-box", limit=limit)
+        questions = islice(iter_elements(response.text, "a", {"class": "q-box"}), limit)
         question_list = []
-        for question in questions:
-            title = question.get_text(strip=True)
-            link = question.get("href")
+        for title, attrs in questions:
+            link = attrs.get("href")
             if title and link:
                 if not link.startswith("http" ):
                     link = f"https://www.quora.com{link}"
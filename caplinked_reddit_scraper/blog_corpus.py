@@ -0,0 +1,290 @@
+"""
+Local full-text corpus of CapLinked blog posts
+Whole article text in SQLite with an FTS5 index, refreshed per URL only when a post is new or
+its last-modified date moves, so content lookups and ranked search never touch the site;
+prompt-sized reductions of each article are stored alongside until the article changes
+"""
+
+import re
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import requests
+
+try:
+    from .http_cache import fetch_parsed
+    from .html_extract import extract_first
+    from .blog_feed import list_all_posts
+except ImportError:
+    from http_cache import fetch_parsed
+    from html_extract import extract_first
+    from blog_feed import list_all_posts
+
+BLOG_CORPUS_FILE = 'blog_corpus.db'
+
+# Sitemaps first: they list every post with its last-modified date, the feeds only the latest few
+CORPUS_URLS = (
+    "https://www.caplinked.com/post-sitemap.xml",
+    "https://www.caplinked.com/sitemap.xml",
+    "https://www.caplinked.com/blog/feed/",
+    "https://www.caplinked.com/feed/",
+)
+
+# Articles fetched per refresh at most, newest first, and in flight at once; a larger
+# backlog fills in over the following runs
+REFRESH_LIMIT = 50
+REFRESH_WORKERS = 8
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+}
+
+_QUERY_WORD = re.compile(r"\w+")
+# Left out of search queries: function words, and filler common in forum titles, match almost any post
+_STOPWORDS = frozenset(
+    "a about all also am an and any anyone are as at be been best but by can could did do does doing for "
+    "from get getting good had has have help how i if in into is it its just like me my need no not of "
+    "on one or our out should so some than that the their them then there these they this to too us "
+    "use using very was we were what when where which who why will with would you your".split()
+)
+
+
+def extract_article(html):
+    """Title and full main text of a blog post page, or None when the page has no article body"""
+    title = extract_first(html, 'h1')
+    content = (
+        extract_first(html, 'div', {'class': 'post-content'})
+        or extract_first(html, 'article')
+        or extract_first(html, 'div', {'class': 'content'})
+    )
+    if not content:
+        return None
+    for element in content(['script', 'style']):
+        element.decompose()
+    return {
+        'title': title.get_text(strip=True) if title else "",
+        'content': content.get_text(separator=' ', strip=True),
+    }
+
+
+def _match_query(text):
+    """
+    Free text as an FTS5 query matching any of its content words, quoted so no word is read as syntax.
+
+    Stopwords and single characters are dropped, as is any repeat.
+    """
+    words = dict.fromkeys(
+        word for word in _QUERY_WORD.findall(text.lower()) if len(word) > 1 and word not in _STOPWORDS
+    )
+    return ' OR '.join(f'"{word}"' for word in words)
+
+
+class BlogCorpus:
+    """
+    SQLite table of blog posts (URL, title, full text, last-modified) with an FTS5 index over it.
+
+    The index is an external-content FTS5 table kept in step by triggers, so
+    a post is stored once and upsert() is all a writer needs. search() ranks
+    with BM25, a title match weighing more than a body match. Reduced texts
+    (see get_reduced_article) are kept per URL and reduction key, and
+    upsert() drops a post's reductions along with its old text.
+    """
+
+    def __init__(self, path=BLOG_CORPUS_FILE):
+        self.fetched = 0
+        self.served = 0
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.executescript(
+            """CREATE TABLE IF NOT EXISTS posts (
+                id INTEGER PRIMARY KEY,
+                url TEXT UNIQUE NOT NULL,
+                title TEXT NOT NULL,
+                content TEXT NOT NULL,
+                last_modified TEXT,
+                fetched_at TEXT NOT NULL
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5(
+                title, content, content='posts', content_rowid='id', tokenize='porter unicode61'
+            );
+            CREATE TABLE IF NOT EXISTS reductions (
+                url TEXT NOT NULL,
+                reduction_key TEXT NOT NULL,
+                content TEXT NOT NULL,
+                PRIMARY KEY (url, reduction_key)
+            );
+            CREATE TRIGGER IF NOT EXISTS posts_ai AFTER INSERT ON posts BEGIN
+                INSERT INTO posts_fts (rowid, title, content) VALUES (new.id, new.title, new.content);
+            END;
+            CREATE TRIGGER IF NOT EXISTS posts_ad AFTER DELETE ON posts BEGIN
+                INSERT INTO posts_fts (posts_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+            END;
+            CREATE TRIGGER IF NOT EXISTS posts_au AFTER UPDATE ON posts BEGIN
+                INSERT INTO posts_fts (posts_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+                INSERT INTO posts_fts (rowid, title, content) VALUES (new.id, new.title, new.content);
+            END;"""
+        )
+        self.conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM posts").fetchone()[0]
+
+    def get(self, url):
+        """The stored post for url as {'url', 'title', 'content', 'last_modified'}, or None"""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT url, title, content, last_modified FROM posts WHERE url = ?", (url,)
+            ).fetchone()
+        if not row:
+            return None
+        return {'url': row[0], 'title': row[1], 'content': row[2], 'last_modified': row[3]}
+
+    def posts(self):
+        """Every stored post as {'url', 'title', 'content'}, newest first"""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT url, title, content FROM posts ORDER BY last_modified DESC, id DESC"
+            ).fetchall()
+        return [{'url': url, 'title': title, 'content': content} for url, title, content in rows]
+
+    def is_current(self, url, last_modified=None):
+        """True if url is stored and no older than last_modified (any stored copy when that is unknown)"""
+        with self._lock:
+            row = self.conn.execute("SELECT last_modified FROM posts WHERE url = ?", (url,)).fetchone()
+        if not row:
+            return False
+        return not last_modified or not row[0] or row[0] >= last_modified
+
+    def upsert(self, url, title, content, last_modified=None):
+        with self._lock:
+            self.conn.execute(
+                """INSERT INTO posts (url, title, content, last_modified, fetched_at) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET title = excluded.title, content = excluded.content,
+                    last_modified = excluded.last_modified, fetched_at = excluded.fetched_at""",
+                (url, title, content, last_modified, datetime.now().isoformat())
+            )
+            self.conn.execute("DELETE FROM reductions WHERE url = ?", (url,))
+            self.conn.commit()
+
+    def get_reduction(self, url, key):
+        """The reduced text stored for url under key, or None"""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT content FROM reductions WHERE url = ? AND reduction_key = ?", (url, key)
+            ).fetchone()
+        return row[0] if row else None
+
+    def store_reduction(self, url, key, content):
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO reductions (url, reduction_key, content) VALUES (?, ?, ?)",
+                (url, key, content)
+            )
+            self.conn.commit()
+
+    def search(self, text, limit=5, min_score=0.0):
+        """
+        Posts best matching the content words of text, best first, as {'url', 'title', 'snippet', 'score'}.
+
+        Higher scores are better (negated FTS5 bm25 rank, title column weighted 5x);
+        posts scoring below min_score are left out.
+        """
+        query = _match_query(text)
+        if not query:
+            return []
+        with self._lock:
+            rows = self.conn.execute(
+                """SELECT posts.url, posts.title, snippet(posts_fts, 1, '', '', '...', 24), bm25(posts_fts, 5.0, 1.0)
+                FROM posts_fts JOIN posts ON posts.id = posts_fts.rowid
+                WHERE posts_fts MATCH ? ORDER BY bm25(posts_fts, 5.0, 1.0) LIMIT ?""",
+                (query, limit)
+            ).fetchall()
+        return [
+            {'url': url, 'title': title, 'snippet': snippet, 'score': -rank}
+            for url, title, snippet, rank in rows if -rank >= min_score
+        ]
+
+    def stats(self):
+        """One-line summary for end-of-run reporting"""
+        return f"Blog corpus: {self.served} served locally, {self.fetched} fetched, {len(self)} posts stored"
+
+
+_default_corpus = None
+_default_corpus_lock = threading.Lock()
+
+
+def get_corpus():
+    """Return the process-wide corpus, opening it on first use"""
+    global _default_corpus
+    with _default_corpus_lock:
+        if _default_corpus is None:
+            _default_corpus = BlogCorpus()
+        return _default_corpus
+
+
+def get_article(url, last_modified=None, fetch=None):
+    """
+    The post at url as {'url', 'title', 'content', 'last_modified'}, from the corpus when current.
+
+    Otherwise the page is fetched (conditionally, through the HTTP cache),
+    its full text stored, and the fresh record returned. Returns None when
+    the page has no article body; HTTP errors are raised as requests
+    exceptions.
+    """
+    corpus = get_corpus()
+    if corpus.is_current(url, last_modified):
+        corpus.served += 1
+        return corpus.get(url)
+
+    article = fetch_parsed(url, extract_article, parser_key="corpus_article", headers=HEADERS, timeout=15, fetch=fetch)
+    if not article:
+        return None
+    title = article['title'] or url.rstrip('/').rsplit('/', 1)[-1].replace('-', ' ').title()
+    corpus.upsert(url, title, article['content'], last_modified)
+    corpus.fetched += 1
+    return corpus.get(url)
+
+
+def get_reduced_article(url, key, reduce, last_modified=None, fetch=None):
+    """
+    The post at url as get_article() returns it, but with 'content' replaced by reduce(content).
+
+    The reduction (e.g. a prompt budget) is computed once per post and key
+    and stored in the corpus, so a later call for an unchanged post costs
+    two lookups; key must change whenever reduce would give a different text.
+    """
+    article = get_article(url, last_modified, fetch=fetch)
+    if not article:
+        return None
+    corpus = get_corpus()
+    content = corpus.get_reduction(url, key)
+    if content is None:
+        content = reduce(article['content'])
+        corpus.store_reduction(url, key, content)
+    return dict(article, content=content)
+
+
+def refresh_corpus(limit=REFRESH_LIMIT, fetch=None):
+    """
+    Store every listed blog post that is new or modified since it was stored, up to limit of them.
+
+    Returns the number of posts fetched; posts that fail to fetch are left
+    for the next refresh.
+    """
+    corpus = get_corpus()
+    listed = list_all_posts(CORPUS_URLS, fetch=fetch) or []
+    stale = [post for post in listed if not corpus.is_current(post['url'], post['published'])][:limit]
+
+    def refresh(post):
+        try:
+            return get_article(post['url'], post['published'], fetch=fetch) is not None
+        except requests.RequestException:
+            return False
+
+    if not stale:
+        return 0
+    with ThreadPoolExecutor(max_workers=REFRESH_WORKERS) as pool:
+        return sum(pool.map(refresh, stale))
@@ -0,0 +1,186 @@
+"""
+Embedding index of CapLinked blog posts
+One normalised embedding per post in a flat float32 file, memory-mapped as a NumPy matrix and
+appended to as new posts appear, so linking a thread to its closest article is a local
+matrix product rather than a network call
+"""
+
+import hashlib
+import json
+import os
+import re
+
+import numpy as np
+
+from blog_corpus import get_corpus, refresh_corpus
+
+# Rows file (<prefix>.f32) and its metadata: embedder, dimensions and the post behind each row
+BLOG_INDEX_FILE = 'blog_embeddings'
+
+# Leading characters of each article embedded along with its title
+EMBEDDED_CONTENT_CHARS = 2000
+
+EMBEDDING_MODEL = "text-embedding-3-small"
+EMBEDDING_BATCH_SIZE = 256
+
+# Without an OpenAI client, posts and titles are embedded locally by feature hashing
+HASH_DIMENSIONS = 512
+
+_WORD = re.compile(r"[a-z0-9][a-z0-9'&-]*")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have how i in is it its my of on or our that the "
+    "their this to was we what when where which who why will with you your".split()
+)
+
+
+def _normalize(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return (matrix / np.where(norms == 0, 1, norms)).astype(np.float32)
+
+
+def hashing_embed(texts):
+    """Signed feature-hashing embedding of words and word pairs; deterministic and offline"""
+    matrix = np.zeros((len(texts), HASH_DIMENSIONS), dtype=np.float32)
+    for row, text in enumerate(texts):
+        words = [w for w in _WORD.findall(text.lower()) if w not in _STOPWORDS]
+        for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+            h = int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'little')
+            matrix[row, h % HASH_DIMENSIONS] += 1.0 if h >> 63 else -1.0
+    return _normalize(matrix)
+
+
+hashing_embed.model = f"hashing-{HASH_DIMENSIONS}"
+
+
+def openai_embedder(client, model=EMBEDDING_MODEL):
+    """Return an embed(texts) function backed by the OpenAI embeddings API, batched per request"""
+    def embed(texts):
+        vectors = []
+        for start in range(0, len(texts), EMBEDDING_BATCH_SIZE):
+            response = client.embeddings.create(model=model, input=list(texts[start:start + EMBEDDING_BATCH_SIZE]))
+            vectors.extend(item.embedding for item in response.data)
+        return _normalize(np.array(vectors, dtype=np.float32))
+
+    embed.model = model
+    return embed
+
+
+def _embedded_text(post):
+    return f"{post['title']}. {post['content'][:EMBEDDED_CONTENT_CHARS]}"
+
+
+def get_embedder(client):
+    return openai_embedder(client) if client else hashing_embed
+
+
+class BlogIndex:
+    """
+    Blog post embeddings on disk, memory-mapped for lookups.
+
+    refresh() brings the local blog corpus up to date, then embeds only
+    stored posts the index doesn't hold yet, appending their rows, and
+    posts whose text changed since they were embedded, overwriting theirs;
+    an index built by a different embedder is rebuilt from scratch, and a
+    rows file missing or shorter than its metadata says is read as empty.
+    best_matches() returns the k nearest posts per text by
+    cosine similarity (rows are unit length, so a single matrix product).
+    """
+
+    def __init__(self, path=BLOG_INDEX_FILE):
+        self.rows_path = path + '.f32'
+        self.meta_path = path + '.json'
+        try:
+            with open(self.meta_path) as f:
+                meta = json.load(f)
+        except (FileNotFoundError, ValueError):
+            meta = {}
+        self.model = meta.get('model')
+        self.dimensions = meta.get('dimensions', 0)
+        self.posts = meta.get('posts', [])
+        self._map()
+
+    def __len__(self):
+        return len(self.posts)
+
+    def _map(self):
+        size = len(self.posts) * self.dimensions * 4
+        try:
+            rows_size = os.path.getsize(self.rows_path)
+        except FileNotFoundError:
+            rows_size = 0
+        if rows_size < size:
+            # Rows lost or cut short: start over rather than map rows that aren't there
+            self.posts = []
+            size = 0
+        if not self.posts:
+            if rows_size:
+                os.remove(self.rows_path)
+            self.matrix = np.zeros((0, self.dimensions), dtype=np.float32)
+            return
+        # Rows written by a run that died before saving the metadata are dropped
+        if rows_size > size:
+            os.truncate(self.rows_path, size)
+        self.matrix = np.memmap(self.rows_path, dtype=np.float32, mode='r',
+                                shape=(len(self.posts), self.dimensions))
+
+    def _save_meta(self):
+        temp = self.meta_path + '.tmp'
+        with open(temp, 'w') as f:
+            json.dump({'model': self.model, 'dimensions': self.dimensions, 'posts': self.posts}, f)
+        os.replace(temp, self.meta_path)
+
+    def refresh(self, embed, fetch=None):
+        """Embed every blog post in the refreshed corpus that is new or changed; returns how many"""
+        if self.model != embed.model:
+            self.model, self.dimensions, self.posts = embed.model, 0, []
+            if os.path.exists(self.rows_path):
+                os.remove(self.rows_path)
+
+        refresh_corpus(fetch=fetch)
+        rows = {post['url']: row for row, post in enumerate(self.posts)}
+        new, changed = [], []
+        for post in get_corpus().posts():
+            text = _embedded_text(post)
+            post['digest'] = hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+            row = rows.get(post['url'])
+            if row is None:
+                new.append((post, text))
+            elif self.posts[row].get('digest') != post['digest']:
+                changed.append((row, post, text))
+        if not new and not changed:
+            return 0
+
+        vectors = embed([text for _, text in new] + [text for _, _, text in changed])
+        if self.posts and vectors.shape[1] != self.dimensions:
+            raise ValueError(f"{embed.model} returned {vectors.shape[1]} dimensions, the index holds {self.dimensions}")
+        row_size = vectors.shape[1] * 4
+        with open(self.rows_path, 'r+b' if os.path.exists(self.rows_path) else 'w+b') as f:
+            for i, (row, post, _) in enumerate(changed, len(new)):
+                f.seek(row * row_size)
+                f.write(vectors[i].tobytes())
+                self.posts[row] = {'url': post['url'], 'title': post['title'], 'digest': post['digest']}
+            f.seek(len(self.posts) * row_size)
+            f.write(vectors[:len(new)].tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        self.dimensions = vectors.shape[1]
+        self.posts += [{'url': post['url'], 'title': post['title'], 'digest': post['digest']} for post, _ in new]
+        self._save_meta()
+        self._map()
+        return len(new) + len(changed)
+
+    def best_matches(self, texts, embed, k=1, min_similarity=0.0):
+        """For each text, up to k (post, similarity) pairs at or above min_similarity, best first"""
+        if not self.posts or not texts:
+            return [[] for _ in texts]
+        similarities = embed(list(texts)) @ self.matrix.T
+        k = min(k, len(self.posts))
+        nearest = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+        matches = []
+        for row, columns in enumerate(nearest):
+            columns = columns[np.argsort(-similarities[row, columns])]
+            matches.append([
+                (self.posts[i], float(similarities[row, i]))
+                for i in columns if similarities[row, i] >= min_similarity
+            ])
+        return matches
@@ -0,0 +1,113 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
+
+from http_client import get_session
+
+# Upper bound on requests in flight across all hosts
+MAX_WORKERS = 32
+
+# Upper bound on requests in flight against any single host
+PER_HOST_LIMIT = 16
+
+# Tighter limits for hosts that throttle unauthenticated clients hard
+HOST_LIMITS = {
+    'www.reddit.com': 2,
+}
+
+# A 429 pauses every request to its host for Retry-After seconds (or an exponential
+# back-off when the header is missing), capped, and the request is retried this many times
+RATE_LIMIT_RETRIES = 3
+RATE_LIMIT_BACKOFF = 5.0
+MAX_RATE_LIMIT_PAUSE = 60.0
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+}
+
+
+def _retry_after_seconds(response, attempt):
+    """Seconds to pause a host after a 429: Retry-After if sent, else exponential"""
+    try:
+        delay = float(response.headers.get('retry-after'))
+    except (TypeError, ValueError):
+        delay = RATE_LIMIT_BACKOFF * 2 ** attempt
+    return min(max(delay, 0.0), MAX_RATE_LIMIT_PAUSE)
+
+
+class FetchEngine:
+    """Run many HTTP fetch jobs at once over the shared, connection-pooled session"""
+
+    def __init__(self, max_workers=MAX_WORKERS, per_host_limit=PER_HOST_LIMIT, headers=None, host_limits=None):
+        self.max_workers = max_workers
+        self.per_host_limit = per_host_limit
+        self.host_limits = HOST_LIMITS if host_limits is None else host_limits
+
+        self.headers = headers or DEFAULT_HEADERS
+        self.session = get_session()
+
+        self._host_slots = {}
+        self._resume_at = {}
+        self._lock = threading.Lock()
+
+    def _slot_for(self, host):
+        """Return the semaphore that caps concurrency for host"""
+        with self._lock:
+            if host not in self._host_slots:
+                limit = self.host_limits.get(host, self.per_host_limit)
+                self._host_slots[host] = threading.BoundedSemaphore(limit)
+            return self._host_slots[host]
+
+    def _wait_for(self, host):
+        """Sleep out any pause a 429 put on host"""
+        with self._lock:
+            delay = self._resume_at.get(host, 0.0) - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def _pause(self, host, delay):
+        with self._lock:
+            self._resume_at[host] = max(self._resume_at.get(host, 0.0), time.monotonic() + delay)
+
+    def get(self, url, **kwargs):
+        """
+        GET a URL through the shared session, respecting the per-host limit.
+
+        A 429 pauses the whole host and the request is retried up to
+        RATE_LIMIT_RETRIES times; the last response is returned either way.
+        """
+        kwargs.setdefault('timeout', 10)
+        kwargs['headers'] = {**self.headers, **(kwargs.get('headers') or {})}
+        host = urlparse(url).netloc.lower()
+        slot = self._slot_for(host)
+        for attempt in range(RATE_LIMIT_RETRIES + 1):
+            self._wait_for(host)
+            with slot:
+                response = self.session.get(url, **kwargs)
+            if response.status_code != 429 or attempt == RATE_LIMIT_RETRIES:
+                return response
+            delay = _retry_after_seconds(response, attempt)
+            print(f"  Rate limited by {host}, pausing its requests for {delay:g}s")
+            self._pause(host, delay)
+
+    def run(self, jobs):
+        """
+        Run (func, args) jobs concurrently and yield each result as soon as it finishes.
+
+        Every job is called as func(*args, fetch=self.get) so it issues its
+        requests through the shared session. A job that raises is reported
+        and skipped; it does not stop the sweep.
+        """
+        jobs = list(jobs)
+        if not jobs:
+            return
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(jobs))) as pool:
+            futures = {pool.submit(func, *args, fetch=self.get): (func, args) for func, args in jobs}
+            for future in as_completed(futures):
+                try:
+                    yield future.result()
+                except Exception as e:
+                    func, args = futures[future]
+                    print(f"  ERROR: {func.__name__}{args} failed: {e}")
@@ -0,0 +1,138 @@
+"""
+Conditional HTTP fetching with an on-disk cache of bodies and parsed results
+Revalidates with If-None-Match / If-Modified-Since and skips parsing on 304 Not Modified
+"""
+
+import json
+import sqlite3
+import threading
+import time
+
+try:
+    from . import http_client
+except ImportError:
+    import http_client
+
+HTTP_CACHE_FILE = 'http_cache.db'
+
+
+class HTTPCache:
+    """SQLite store of response validators, bodies and per-parser results, keyed by URL"""
+
+    def __init__(self, path=HTTP_CACHE_FILE):
+        self.not_modified = 0
+        self.fetched = 0
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.executescript(
+            """CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                body BLOB NOT NULL,
+                fetched_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS parsed (
+                url TEXT NOT NULL,
+                parser_key TEXT NOT NULL,
+                result TEXT NOT NULL,
+                PRIMARY KEY (url, parser_key)
+            );"""
+        )
+        self.conn.commit()
+
+    def validators(self, url):
+        """Return (etag, last_modified, body) stored for url, or None"""
+        with self._lock:
+            return self.conn.execute(
+                "SELECT etag, last_modified, body FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+
+    def store_response(self, url, etag, last_modified, body):
+        """Record a fresh 200 response; parses of the old body are discarded"""
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses (url, etag, last_modified, body, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                (url, etag, last_modified, body, time.time())
+            )
+            self.conn.execute("DELETE FROM parsed WHERE url = ?", (url,))
+            self.conn.commit()
+
+    def parsed_result(self, url, parser_key):
+        """Return (found, result) for a stored parse of url's current body"""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT result FROM parsed WHERE url = ? AND parser_key = ?", (url, parser_key)
+            ).fetchone()
+        return (True, json.loads(row[0])) if row else (False, None)
+
+    def store_parsed(self, url, parser_key, result):
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO parsed (url, parser_key, result) VALUES (?, ?, ?)",
+                (url, parser_key, json.dumps(result))
+            )
+            self.conn.commit()
+
+    def stats(self):
+        """One-line summary for end-of-run reporting"""
+        return f"HTTP cache: {self.not_modified} not modified, {self.fetched} fetched"
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """Return the process-wide cache, opening it on first use"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = HTTPCache()
+        return _default_cache
+
+
+def fetch_parsed(url, parse, parser_key, headers=None, timeout=15, fetch=None):
+    """
+    GET url conditionally and return parse(body), reusing stored work where possible.
+
+    parse receives the raw response bytes and must return something JSON
+    serializable. parser_key names the parse (include any arguments that change
+    its output) so different parses of the same page are cached separately.
+    On 304 Not Modified the stored result is returned without parsing. HTTP
+    errors are raised as requests exceptions.
+    """
+    cache = get_cache()
+    fetch = fetch or http_client.get
+    request_headers = dict(headers or {})
+
+    stored = cache.validators(url)
+    if stored:
+        etag, last_modified, _ = stored
+        if etag:
+            request_headers['If-None-Match'] = etag
+        if last_modified:
+            request_headers['If-Modified-Since'] = last_modified
+
+    response = fetch(url, headers=request_headers, timeout=timeout)
+
+    if response.status_code == 304 and stored:
+        cache.not_modified += 1
+        found, result = cache.parsed_result(url, parser_key)
+        if not found:
+            result = parse(stored[2])
+            cache.store_parsed(url, parser_key, result)
+        return result
+
+    response.raise_for_status()
+    cache.fetched += 1
+    body = response.content
+    cache.store_response(url, response.headers.get('ETag'), response.headers.get('Last-Modified'), body)
+    result = parse(body)
+    cache.store_parsed(url, parser_key, result)
+    return result
+
+
+def cache_stats():
+    """Revalidation summary for the process-wide cache"""
+    return get_cache().stats()
@@ -0,0 +1,139 @@
+"""
+Content-addressed cache for OpenAI chat completions
+Identical requests (model, messages, temperature, max_tokens) are answered from disk
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+LLM_CACHE_FILE = 'llm_cache.db'
+LLM_CACHE_TTL_SECONDS = 24 * 60 * 60
+LLM_CACHE_MAX_ENTRIES = 2000
+
+
+def cache_key(model, messages, temperature, max_tokens, response_format=None):
+    """Hash everything that determines the completion into a stable key"""
+    payload = json.dumps(
+        {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "response_format": response_format,
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """SQLite-backed completion cache with a TTL and size-bounded LRU eviction"""
+
+    def __init__(self, path=LLM_CACHE_FILE, ttl=LLM_CACHE_TTL_SECONDS, max_entries=LLM_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS completions (
+                key TEXT PRIMARY KEY,
+                content TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )"""
+        )
+        self.conn.commit()
+
+    def get(self, key):
+        """Return the cached content for key, or None if absent or expired"""
+        now = time.time()
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT content, created_at FROM completions WHERE key = ?", (key,)
+            ).fetchone()
+            if row and now - row[1] < self.ttl:
+                self.conn.execute("UPDATE completions SET last_used = ? WHERE key = ?", (now, key))
+                self.conn.commit()
+                self.hits += 1
+                return row[0]
+            if row:
+                self.conn.execute("DELETE FROM completions WHERE key = ?", (key,))
+                self.conn.commit()
+            self.misses += 1
+            return None
+
+    def put(self, key, content):
+        """Store content under key, evicting expired and least recently used entries"""
+        now = time.time()
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO completions (key, content, created_at, last_used) VALUES (?, ?, ?, ?)",
+                (key, content, now, now)
+            )
+            self.conn.execute("DELETE FROM completions WHERE created_at < ?", (now - self.ttl,))
+            overflow = self.conn.execute("SELECT COUNT(*) FROM completions").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                self.conn.execute(
+                    "DELETE FROM completions WHERE key IN "
+                    "(SELECT key FROM completions ORDER BY last_used ASC LIMIT ?)",
+                    (overflow,)
+                )
+            self.conn.commit()
+
+    def stats(self):
+        """One-line hit/miss summary for end-of-run reporting"""
+        total = self.hits + self.misses
+        rate = (100.0 * self.hits / total) if total else 0.0
+        return f"LLM cache: {self.hits} hits, {self.misses} misses ({rate:.0f}% hit rate)"
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """Return the process-wide cache, opening it on first use"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = LLMCache()
+        return _default_cache
+
+
+def cached_chat_completion(client, model, messages, temperature, max_tokens, **kwargs):
+    """
+    Return the message content of a chat completion, from cache when possible.
+
+    Extra keyword arguments (timeout, response_format, ...) are passed to
+    client.chat.completions.create; only response_format is part of the key.
+    Errors from the API propagate to the caller and nothing is cached.
+    """
+    cache = get_cache()
+    key = cache_key(model, messages, temperature, max_tokens, kwargs.get("response_format"))
+
+    content = cache.get(key)
+    if content is not None:
+        return content
+
+    response = client.chat.completions.create(
+        model=model,
+        messages=messages,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        **kwargs
+    )
+    content = response.choices[0].message.content
+    if content:
+        cache.put(key, content)
+    return content
+
+
+def cache_stats():
+    """Hit/miss summary for the process-wide cache"""
+    return get_cache().stats()
@@ -0,0 +1,188 @@
+"""
+Reddit search listings
+Reads search results newest first from Reddit's JSON listings (or the API through praw when
+credentials are configured), paging with `after` cursors and stopping at the first post
+the previous run already reached
+"""
+
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+REDDIT_BASE = "https://www.reddit.com"
+
+# Posts per listing page (Reddit's maximum), and pages read per search at most
+LISTING_PAGE_SIZE = 100
+MAX_LISTING_PAGES = 5
+
+# A search with no earlier run to resume from takes only its newest posts
+FIRST_RUN_LIMIT = 25
+
+# Newest post time seen per search, so the next run stops where this one started
+LISTING_STATE_FILE = 'reddit_listing.db'
+
+# The official API, used instead of the public JSON listings when these are set
+REDDIT_CLIENT_ID = os.environ.get("REDDIT_CLIENT_ID")
+REDDIT_CLIENT_SECRET = os.environ.get("REDDIT_CLIENT_SECRET")
+REDDIT_USER_AGENT = os.environ.get("REDDIT_USER_AGENT", "caplinked-reddit-monitor/1.0")
+
+try:
+    import praw
+except ImportError:
+    praw = None
+
+# praw.Reddit is not thread-safe, so each search thread gets a client of its own
+_praw_clients = threading.local()
+
+
+def get_praw_client():
+    """Return this thread's read-only praw client when praw and API credentials are available, else None"""
+    if praw is None or not (REDDIT_CLIENT_ID and REDDIT_CLIENT_SECRET):
+        return None
+    client = getattr(_praw_clients, 'client', None)
+    if client is None:
+        client = praw.Reddit(
+            client_id=REDDIT_CLIENT_ID,
+            client_secret=REDDIT_CLIENT_SECRET,
+            user_agent=REDDIT_USER_AGENT,
+        )
+        client.read_only = True
+        _praw_clients.client = client
+    return client
+
+
+def listing_key(query, subreddit=None):
+    return f"{(subreddit or 'all').lower()}:{query.lower()}"
+
+
+def _post(data):
+    return {
+        'title': data['title'],
+        'url': f"{REDDIT_BASE}{data['permalink']}",
+        'subreddit': data.get('subreddit'),
+        'created_utc': float(data.get('created_utc') or 0),
+        'body': data.get('selftext') or '',
+    }
+
+
+def iter_json_listing(query, subreddit=None, fetch=None, headers=None, max_pages=MAX_LISTING_PAGES):
+    """Yield posts from Reddit's JSON search listing, newest first, one page request at a time"""
+    if subreddit:
+        url = f"{REDDIT_BASE}/r/{subreddit}/search.json"
+        params = {'q': query, 'restrict_sr': 'on'}
+    else:
+        url = f"{REDDIT_BASE}/search.json"
+        params = {'q': query}
+    params.update({'sort': 'new', 'type': 'link', 'limit': LISTING_PAGE_SIZE, 'raw_json': 1})
+
+    after = None
+    for _ in range(max_pages):
+        page_params = dict(params, after=after) if after else params
+        response = fetch(url, params=page_params, headers=headers, timeout=10)
+        response.raise_for_status()
+        listing = response.json().get('data') or {}
+
+        for child in listing.get('children', []):
+            if child.get('kind') == 't3':
+                yield _post(child['data'])
+
+        after = listing.get('after')
+        if not after:
+            return
+
+
+def iter_praw_listing(client, query, subreddit=None, max_pages=MAX_LISTING_PAGES):
+    """Yield posts from the API search, newest first; praw follows the `after` cursor itself"""
+    results = client.subreddit(subreddit or 'all').search(query, sort='new', limit=LISTING_PAGE_SIZE * max_pages)
+    for submission in results:
+        yield {
+            'title': submission.title,
+            'url': f"{REDDIT_BASE}{submission.permalink}",
+            'subreddit': submission.subreddit.display_name,
+            'created_utc': float(submission.created_utc),
+            'body': submission.selftext or '',
+        }
+
+
+def search_listing(query, cursors, subreddit=None, fetch=None, headers=None):
+    """
+    Return the posts for a search that are newer than the previous run's newest.
+
+    The listing is sorted newest first, so reading stops at the first post at
+    or before the search's cursor; no later page is requested. Without a
+    cursor only the FIRST_RUN_LIMIT newest posts are taken. The newest post
+    time seen is handed to cursors, which saves it once the run completes.
+    """
+    key = listing_key(query, subreddit)
+    since = cursors.get(key)
+
+    client = get_praw_client()
+    if client is not None:
+        listing = iter_praw_listing(client, query, subreddit)
+    else:
+        listing = iter_json_listing(query, subreddit, fetch=fetch, headers=headers)
+
+    posts = []
+    for post in listing:
+        if since is not None and post['created_utc'] <= since:
+            break
+        posts.append(post)
+        if since is None and len(posts) >= FIRST_RUN_LIMIT:
+            break
+
+    if posts:
+        cursors.advance(key, max(post['created_utc'] for post in posts))
+    return posts
+
+
+class ListingCursors:
+    """
+    Per-search high-water marks: the creation time of the newest post each search returned.
+
+    advance() only records a new mark in memory; commit() saves them, so a run
+    that dies partway rescans the same window next time (posts it already
+    handled are still skipped by the seen index).
+    """
+
+    def __init__(self, path=LISTING_STATE_FILE):
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS listing_cursors (
+                listing_key TEXT PRIMARY KEY,
+                newest_utc REAL NOT NULL,
+                updated_at TEXT NOT NULL
+            )"""
+        )
+        self.conn.commit()
+        self._marks = dict(self.conn.execute("SELECT listing_key, newest_utc FROM listing_cursors"))
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        return self._marks.get(key)
+
+    def advance(self, key, newest_utc):
+        with self._lock:
+            if newest_utc > self._pending.get(key, self._marks.get(key, 0)):
+                self._pending[key] = newest_utc
+
+    def commit(self):
+        with self._lock:
+            now = datetime.now().isoformat()
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO listing_cursors (listing_key, newest_utc, updated_at) VALUES (?, ?, ?)",
+                [(key, newest, now) for key, newest in self._pending.items()]
+            )
+            self.conn.commit()
+            self._marks.update(self._pending)
+            self._pending = {}
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,8 +1,18 @@
-import requests
-from bs4 import BeautifulSoup
+import http_client
 import os
 import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from fetch_engine import FetchEngine
+from llm_cache import cached_chat_completion, cache_stats
+from seen_index import SeenIndex, canonical_url, post_key
+from results_store import ResultsStore
+from reddit_listing import ListingCursors, search_listing
+from relevance import select_relevant
+from blog_index import BlogIndex, get_embedder
+from blog_corpus import get_corpus
 
 # OpenAI API key for comment generation
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
@@ -14,8 +24,9 @@ try:
 except ImportError:
     openai_client = None
 
-# Reddit search URLs
-REDDIT_SEARCH_BASE = "https://www.reddit.com/search"
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+}
 
 # Keywords to search for
 KEYWORDS = ["virtual data room", "VDR", "M&A", "due diligence", "investment banking"]
@@ -23,79 +34,212 @@ KEYWORDS = ["virtual data room", "VDR", "M&A", "due diligence", "investment bank
 # Subreddits to search
 SUBREDDITS = ["investing", "venturecapital", "startups", "finance", "law", "business"]
 
+# Append-only history of every opportunity produced, one JSON record per line
+RESULTS_FILE = 'reddit_opportunities.jsonl'
 
-def generate_ai_comment(thread_title):
-    """Generate an AI-powered comment for a Reddit thread"""
-    if not openai_client:
-        return "Check out CapLinked for secure VDR solutions for M&A and due diligence. Visit caplinked.com to learn more."
-    
+# Only the most relevant new threads of a sweep get a comment, best first; threads sharing
+# no term with the keywords or CapLinked's topics (relevance 0) never do
+MAX_OPPORTUNITIES = 40
+MIN_RELEVANCE = 0.0
+
+# A thread is only linked to a blog article at least this similar (cosine) to its title
+ARTICLE_MIN_SIMILARITY = 0.2
+
+# A thread no article is that similar to falls back to the corpus's full-text search, taking its
+# best hit only at this BM25 score or above (roughly: several of the title's content words, one in
+# the article title)
+ARTICLE_MIN_SEARCH_SCORE = 4.0
+
+# Comment used whenever the model is unavailable or returns nothing usable
+FALLBACK_COMMENT = "Check out CapLinked for secure VDR solutions for M&A and due diligence. Visit caplinked.com to learn more."
+
+# Batched comment generation: titles per model request, and batch requests in flight
+COMMENT_BATCH_SIZE = 15
+COMMENT_BATCH_CONCURRENCY = 3
+COMMENT_BATCH_MAX_RETRIES = 4
+
+
+class _RateLimitGate:
+    """Shared cooldown so one 429 pauses every batch worker, not just the one that hit it"""
+
+    def __init__(self):
+        self._resume_at = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            delay = self._resume_at - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def back_off(self, seconds):
+        with self._lock:
+            self._resume_at = max(self._resume_at, time.monotonic() + seconds)
+
+
+def _retry_after_seconds(error, attempt):
+    """Seconds to back off after a rate-limit error: Retry-After if sent, else exponential"""
+    response = getattr(error, 'response', None)
+    retry_after = response.headers.get('retry-after') if response is not None else None
     try:
-        prompt = f"""Generate a helpful, professional comment for a Reddit thread about: {thread_title}
+        return float(retry_after)
+    except (TypeError, ValueError):
+        return 2 ** attempt
+
+
+def _thread_line(post):
+    """A thread as the comment prompt lists it: its title, and its matched blog article if any"""
+    article = post.get('article')
+    if not article:
+        return post['title']
+    return f"{post['title']} (related CapLinked article: {article['title']} - {article['url']})"
+
+
+def _generate_comment_batch(titles, gate):
+    """Generate comments for a batch of titles in one model request, keyed by position"""
+    numbered = "\n".join(f"{i}. {title}" for i, title in enumerate(titles, 1))
+    prompt = f"""Generate a helpful, professional comment for each of these Reddit threads:
 
-Requirements:
+{numbered}
+
+Requirements for every comment:
 - Be helpful and informative, not promotional
 - Mention CapLinked as a relevant solution if appropriate
 - Keep it under 250 characters
 - Sound natural and conversational
 - Include a subtle call-to-action
+- Where a related CapLinked article is given, link that article rather than the home page
 
-Generate only the comment text, nothing else."""
+Respond with JSON only, in the form:
+{{"comments": [{{"id": 1, "comment": "..."}}, ...]}}
+with exactly one entry per thread, using the thread numbers above as ids."""
 
-        response = openai_client.chat.completions.create(
-            model="gpt-4.1-mini",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.7,
-            max_tokens=120,
-            timeout=30
-        )
-        
-        comment = response.choices[0].message.content.strip()
-        return comment
-        
+    for attempt in range(COMMENT_BATCH_MAX_RETRIES):
+        gate.wait()
+        try:
+            content = cached_chat_completion(
+                openai_client,
+                model="gpt-4.1-mini",
+                messages=[{"role": "user", "content": prompt}],
+                response_format={"type": "json_object"},
+                temperature=0.7,
+                max_tokens=120 * len(titles) + 100,
+                timeout=60
+            )
+            data = json.loads(content)
+            comments = {}
+            for item in data.get("comments", []):
+                try:
+                    comment = str(item["comment"]).strip()
+                    if comment:
+                        comments[int(item["id"]) - 1] = comment
+                except (KeyError, TypeError, ValueError):
+                    continue
+            return comments
+        except Exception as e:
+            if getattr(e, 'status_code', None) == 429 and attempt < COMMENT_BATCH_MAX_RETRIES - 1:
+                delay = _retry_after_seconds(e, attempt)
+                print(f"    Rate limited by OpenAI, pausing comment batches for {delay:g}s")
+                gate.back_off(delay)
+                continue
+            print(f"    WARNING: Failed to generate AI comment batch: {e}")
+            return {}
+    return {}
+
+
+def _batch_comments(titles, gate):
+    """Comments for one batch of titles, in order; any title the model skipped gets FALLBACK_COMMENT"""
+    if not openai_client:
+        return [FALLBACK_COMMENT] * len(titles)
+    comments = _generate_comment_batch(titles, gate)
+    return [comments.get(i, FALLBACK_COMMENT) for i in range(len(titles))]
+
+
+def generate_ai_comments(posts):
+    """
+    Generate AI-powered comments for posts, yielding (post, comment) in the posts' order.
+
+    Posts are packed COMMENT_BATCH_SIZE to a model request and up to
+    COMMENT_BATCH_CONCURRENCY requests are in flight at once; each batch's
+    results are yielded as soon as it and every batch before it are done.
+    """
+    gate = _RateLimitGate()
+    batches = [posts[i:i + COMMENT_BATCH_SIZE] for i in range(0, len(posts), COMMENT_BATCH_SIZE)]
+
+    def generate(batch):
+        try:
+            return _batch_comments([_thread_line(post) for post in batch], gate)
+        except Exception as e:
+            print(f"    WARNING: Failed to generate AI comment batch: {e}")
+            return [FALLBACK_COMMENT] * len(batch)
+
+    with ThreadPoolExecutor(max_workers=COMMENT_BATCH_CONCURRENCY) as pool:
+        for batch, comments in zip(batches, pool.map(generate, batches)):
+            yield from zip(batch, comments)
+
+
+def refresh_article_index():
+    """
+    Bring the blog corpus and its embedding index up to date, returning the index.
+
+    New and changed blog posts are stored in the local corpus and embedded; returns None
+    when the refresh fails, so threads go unlinked rather than the run failing.
+    """
+    try:
+        index = BlogIndex()
+        added = index.refresh(get_embedder(openai_client))
     except Exception as e:
-        print(f"    WARNING: Failed to generate AI comment: {e}")
-        return "Check out CapLinked for secure VDR solutions for M&A and due diligence. Visit caplinked.com to learn more."
+        print(f"  WARNING: Failed to refresh the blog article index: {e}\n")
+        return None
+    if added:
+        print(f"Indexed {added} new or changed blog posts ({len(index)} in the article index)")
+    return index
+
 
+def attach_articles(posts, index):
+    """
+    Set post['article'] to the CapLinked blog article closest to each post's title.
 
-def search_reddit_keyword(keyword):
-    """Search Reddit for a specific keyword using web scraping"""
+    The titles are embedded together (one request with an OpenAI client,
+    none without) and matched against the memory-mapped index locally. A
+    title with no article at or above ARTICLE_MIN_SIMILARITY gets the blog
+    corpus's best full-text match on its content words instead, when that
+    scores at least ARTICLE_MIN_SEARCH_SCORE; otherwise it is left unlinked.
+    """
+    if not posts:
+        return
+    matches = [[] for _ in posts]
+    if index is not None:
+        try:
+            matches = index.best_matches([post['title'] for post in posts], get_embedder(openai_client),
+                                         min_similarity=ARTICLE_MIN_SIMILARITY)
+        except Exception as e:
+            print(f"  WARNING: Failed to match blog articles by embedding: {e}\n")
+    for post, match in zip(posts, matches):
+        if match:
+            article, similarity = match[0]
+            post['article'] = {'title': article['title'], 'url': article['url'], 'similarity': round(similarity, 3)}
+            continue
+        try:
+            hits = get_corpus().search(post['title'], limit=1, min_score=ARTICLE_MIN_SEARCH_SCORE)
+        except Exception as e:
+            print(f"  WARNING: Failed to search blog articles: {e}\n")
+            hits = []
+        if hits:
+            post['article'] = {'title': hits[0]['title'], 'url': hits[0]['url'], 'score': round(hits[0]['score'], 3)}
+    print(f"Matched a blog article to {sum('article' in post for post in posts)} of {len(posts)} threads\n")
+
+
+def search_reddit_keyword(keyword, cursors, fetch=None):
+    """Search all of Reddit for a keyword, returning posts newer than the last run"""
     print(f"--- Searching Reddit for: {keyword} ---")
     
-    posts = []
-    
-    # Search across all of Reddit
-    search_url = f"{REDDIT_SEARCH_BASE}/?q={keyword}&type=link&sort=new"
-    
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
-        response = requests.get(search_url, headers=headers, timeout=10)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.text, 'html.parser')
+        posts = search_listing(keyword, cursors, fetch=fetch or http_client.get, headers=HEADERS)
         
-        # Find post links - Reddit uses various selectors
-        post_elements = soup.find_all('a', {'data-testid': 'internal-unauthenticated-link'})
-        
-        for element in post_elements[:5]:  # Limit to 5 posts per keyword
-            try:
-                title = element.get_text(strip=True)
-                href = element.get('href', '')
-                
-                if href and title and not href.startswith('/r/'):
-                    # Build full Reddit URL
-                    if not href.startswith('http'):
-                        href = f"https://reddit.com{href}"
-                    
-                    posts.append({
-                        'title': title,
-                        'url': href
-                    })
-                    print(f"  - {title}")
-                    
-            except Exception as e:
-                continue
+        for post in posts:
+            post['keywords'] = {keyword}
+            print(f"  - {post['title']}")
         
         print(f"Found {len(posts)} posts\n")
         return posts
@@ -105,122 +249,144 @@ def search_reddit_keyword(keyword):
         return []
 
 
-def search_reddit_subreddit(subreddit, keyword):
-    """Search a specific subreddit for a keyword"""
-    posts = []
-    
-    search_url = f"https://www.reddit.com/r/{subreddit}/search/?q={keyword}&type=link&sort=new"
-    
+def search_reddit_subreddit(subreddit, keyword, cursors, fetch=None):
+    """Search a specific subreddit for a keyword, returning posts newer than the last run"""
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
-        response = requests.get(search_url, headers=headers, timeout=10)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Find post links
-        post_elements = soup.find_all('a', {'data-testid': 'internal-unauthenticated-link'})
-        
-        for element in post_elements[:3]:  # Limit to 3 posts per subreddit/keyword combo
-            try:
-                title = element.get_text(strip=True)
-                href = element.get('href', '')
-                
-                if href and title and not href.startswith('/r/'):
-                    if not href.startswith('http'):
-                        href = f"https://reddit.com{href}"
-                    
-                    posts.append({
-                        'title': title,
-                        'url': href,
-                        'subreddit': subreddit
-                    })
-                    
-            except Exception as e:
-                continue
+        posts = search_listing(keyword, cursors, subreddit=subreddit, fetch=fetch or http_client.get, headers=HEADERS)
         
+        for post in posts:
+            post['keywords'] = {keyword}
         return posts
         
     except Exception as e:
+        print(f"  ERROR: Failed to search r/{subreddit} for '{keyword}': {e}\n")
         return []
 
 
+def iter_new_posts(engine, jobs, seen_index):
+    """
+    Run the search jobs and yield each unique thread once, as soon as a search first finds it.
+
+    Results are indexed by the post key of their canonical URL, so a thread
+    found by several keywords, or under several URL forms, is a single post:
+    later matches only add their keyword to its 'keywords' set, which is still
+    growing while the post waits for its comment. Threads an earlier run
+    handled are skipped.
+    """
+    found = {}
+    merged = 0
+    for posts in engine.run(jobs):
+        for post in posts:
+            post['url'] = canonical_url(post['url'])
+            key = post_key(post['url'])
+            if key in found:
+                found[key]['keywords'].update(post['keywords'])
+                merged += 1
+                continue
+            if post['url'] in seen_index:
+                continue
+            found[key] = post
+            yield post
+    print(f"Merged {merged} duplicate search results into {len(found)} unique threads\n")
+
+
 def main():
     print("--- Starting Reddit Scraper ---\n")
     
-    all_posts = []
-    engagement_log = []
+    # Each search resumes from where the last run's listing started
+    cursors = ListingCursors()
+    
+    # Search every keyword across all of Reddit and within each subreddit at once
+    jobs = [(search_reddit_keyword, (keyword, cursors)) for keyword in KEYWORDS]
+    jobs += [(search_reddit_subreddit, (subreddit, keyword, cursors)) for subreddit in SUBREDDITS for keyword in KEYWORDS]
     
-    # Search by keyword across all subreddits
-    for keyword in KEYWORDS:
-        posts = search_reddit_keyword(keyword)
-        all_posts.extend(posts)
+    # Posts an earlier run already generated a comment for are skipped
+    seen_index = SeenIndex()
+    
+    # Every opportunity is appended to the history for programmatic access as soon as it exists
+    results = ResultsStore(RESULTS_FILE)
     
     print("=" * 80)
     print("REDDIT ENGAGEMENT OPPORTUNITIES")
     print("=" * 80)
     print(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
     
-    # Generate engagement opportunities with AI comments
+    # fetch -> dedupe -> score -> link -> generate -> emit: the whole sweep is scored locally, and
+    # only the best MAX_OPPORTUNITIES threads go to the model, printed and saved best first. The
+    # blog article index refreshes in the background meanwhile.
+    with ThreadPoolExecutor(max_workers=1) as background:
+        article_index = background.submit(refresh_article_index)
+        new_posts = iter_new_posts(FetchEngine(), jobs, seen_index)
+        selected = select_relevant(new_posts, KEYWORDS, MAX_OPPORTUNITIES, MIN_RELEVANCE)
+        print(f"Selected the {len(selected)} most relevant threads for comments\n")
+        attach_articles(selected, article_index.result())
     opportunity_num = 0
-    for post in all_posts:
-        opportunity_num += 1
-        
-        print(f"OPPORTUNITY #{opportunity_num}")
-        print("-" * 80)
-        print(f"Title: {post['title']}")
-        print(f"Link: {post['url']}")
-        print()
-        
-        # Generate AI comment
-        suggested_comment = generate_ai_comment(post['title'])
-        print(f"SUGGESTED COMMENT:")
-        print(f'"{suggested_comment}"')
-        print()
-        print("ACTION: Review the thread and add the suggested comment if appropriate.")
-        print("-" * 80)
-        print()
-        
-        # Store in engagement log
-        engagement_log.append({
-            'opportunity_num': opportunity_num,
-            'title': post['title'],
-            'url': post['url'],
-            'suggested_comment': suggested_comment
-        })
     
-    # Save engagement log to file
-    try:
-        with open('reddit_engagement_log.txt', 'w') as f:
-            f.write("=" * 80 + "\n")
-            f.write("CAPLINKED REDDIT ENGAGEMENT OPPORTUNITIES\n")
-            f.write("=" * 80 + "\n")
-            f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"Total Opportunities: {len(engagement_log)}\n")
-            f.write("=" * 80 + "\n\n")
+    with open('reddit_engagement_log.txt', 'w') as log:
+        log.write("=" * 80 + "\n")
+        log.write("CAPLINKED REDDIT ENGAGEMENT OPPORTUNITIES\n")
+        log.write("=" * 80 + "\n")
+        log.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        log.write("=" * 80 + "\n\n")
+        
+        for post, suggested_comment in generate_ai_comments(selected):
+            opportunity_num += 1
             
-            for opp in engagement_log:
-                f.write(f"\n{opp['opportunity_num']}. {opp['title']}\n")
-                f.write(f"   Link: {opp['url']}\n")
-                f.write(f"\n   SUGGESTED COMMENT:\n")
-                f.write(f'   "{opp["suggested_comment"]}"\n')
-                f.write(f"\n   {'─' * 76}\n")
+            print(f"OPPORTUNITY #{opportunity_num}")
+            print("-" * 80)
+            print(f"Title: {post['title']}")
+            print(f"Link: {post['url']}")
+            print(f"Matched: {', '.join(sorted(post['keywords']))} (relevance {post['relevance']})")
+            if post.get('article'):
+                print(f"Article: {post['article']['title']} - {post['article']['url']}")
+            print()
+            
+            print(f"SUGGESTED COMMENT:")
+            print(f'"{suggested_comment}"')
+            print()
+            print("ACTION: Review the thread and add the suggested comment if appropriate.")
+            print("-" * 80)
+            print()
+            
+            results.append({
+                'opportunity_num': opportunity_num,
+                'title': post['title'],
+                'url': post['url'],
+                'keywords': sorted(post['keywords']),
+                'relevance': post['relevance'],
+                'article': post.get('article'),
+                'suggested_comment': suggested_comment,
+                'generated_at': datetime.now().isoformat()
+            })
+            
+            log.write(f"\n{opportunity_num}. {post['title']}\n")
+            log.write(f"   Link: {post['url']}\n")
+            log.write(f"   Matched: {', '.join(sorted(post['keywords']))}\n")
+            if post.get('article'):
+                log.write(f"   Article: {post['article']['url']}\n")
+            log.write(f"\n   SUGGESTED COMMENT:\n")
+            log.write(f'   "{suggested_comment}"\n')
+            log.write(f"\n   {'─' * 76}\n")
+            log.flush()
+            
+            # Only now that the opportunity is persisted, remember the thread as processed
+            seen_index.mark_seen([post])
         
-        print(f"\nEngagement log saved to 'reddit_engagement_log.txt'")
-    except Exception as e:
-        print(f"WARNING: Could not save engagement log: {e}")
+        log.write(f"\nTotal Opportunities: {opportunity_num}\n")
     
-    # Save JSON for programmatic access
-    try:
-        with open('reddit_opportunities.json', 'w') as f:
-            json.dump(engagement_log, f, indent=2)
-        print(f"Opportunities saved to 'reddit_opportunities.json'")
-    except Exception as e:
-        print(f"WARNING: Could not save JSON: {e}")
+    print(f"\nEngagement log saved to 'reddit_engagement_log.txt'")
+    results.close()
+    print(f"{results.appended} opportunities appended to '{RESULTS_FILE}'")
+    seen_index.close()
+    
+    # Only a completed sweep moves the listing cursors forward
+    cursors.commit()
+    cursors.close()
     
-    print(f"\n--- Reddit scraper finished. Found {len(all_posts)} total posts. ---")
+    if openai_client:
+        print(cache_stats())
+    print(get_corpus().stats())
+    print(f"\n--- Reddit scraper finished. {opportunity_num} new opportunities. ---")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,114 @@
+"""
+Local relevance scoring for Reddit threads
+BM25 over thread titles and bodies against the search keywords and CapLinked's topic vocabulary,
+computed as NumPy arrays, with heap-based selection of the best threads for comment generation
+"""
+
+import heapq
+import re
+
+import numpy as np
+
+# BM25 term-frequency saturation and length normalisation
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# A title word counts this many times as much as a body word
+TITLE_WEIGHT = 2
+
+# Longest query phrase, in words, matched as one term
+MAX_PHRASE_WORDS = 3
+
+# Subjects CapLinked can genuinely help with, weighted below the search keywords themselves
+TOPIC_VOCABULARY = [
+    "data room", "dataroom", "deal room", "diligence", "merger", "acquisition", "acquirer",
+    "private equity", "venture capital", "fundraising", "fundraise", "investor", "cap table",
+    "term sheet", "exit", "buyer", "seller", "document sharing", "file sharing", "secure sharing",
+    "confidential", "nda", "audit trail", "compliance", "board", "closing", "deal", "transaction",
+]
+TOPIC_WEIGHT = 0.5
+
+_TOKEN = re.compile(r"[a-z0-9]+(?:&[a-z0-9]+)*")
+
+
+def tokenize(text):
+    return _TOKEN.findall(text.lower())
+
+
+def build_query(keywords, topics=TOPIC_VOCABULARY, topic_weight=TOPIC_WEIGHT):
+    """Return {term: weight} for the keywords (weight 1) and topic terms; terms are normalised phrases"""
+    query = {' '.join(tokenize(term)): topic_weight for term in topics}
+    query.update({' '.join(tokenize(term)): 1.0 for term in keywords})
+    query.pop('', None)
+    return query
+
+
+def _term_counts(text, index, phrase_words):
+    """Occurrences of each query term (word or phrase) in text, as an array, and text's length in words"""
+    tokens = tokenize(text)
+    hits = []
+    for n in range(1, phrase_words + 1):
+        for i in range(len(tokens) - n + 1):
+            term = index.get(' '.join(tokens[i:i + n]))
+            if term is not None:
+                hits.append(term)
+    return np.bincount(np.array(hits, dtype=np.intp), minlength=len(index)), len(tokens)
+
+
+def bm25_scores(posts, query, k1=BM25_K1, b=BM25_B):
+    """
+    Score every post against query ({term: weight}) with BM25; returns a float array aligned with posts.
+
+    Only the query's own terms are counted, so the term-frequency matrix is
+    posts x query terms regardless of vocabulary size. Titles count
+    TITLE_WEIGHT times; a post's 'body', when present, counts once.
+    """
+    if not posts or not query:
+        return np.zeros(len(posts))
+
+    terms = list(query)
+    index = {term: i for i, term in enumerate(terms)}
+    phrase_words = min(MAX_PHRASE_WORDS, max(len(term.split()) for term in terms))
+
+    tf = np.zeros((len(posts), len(terms)))
+    lengths = np.zeros(len(posts))
+    for row, post in enumerate(posts):
+        counts, length = _term_counts(post['title'], index, phrase_words)
+        tf[row] = TITLE_WEIGHT * counts
+        lengths[row] = TITLE_WEIGHT * length
+        if post.get('body'):
+            counts, length = _term_counts(post['body'], index, phrase_words)
+            tf[row] += counts
+            lengths[row] += length
+
+    # Smoothed idf, log(1 + n/df): the threads were found by searching these very terms, so a
+    # term that occurs in all of them must still count (classic BM25 idf would drop it to ~0)
+    df = np.count_nonzero(tf, axis=0)
+    idf = np.log1p(len(posts) / np.maximum(df, 1))
+    average = lengths.mean() or 1.0
+    norm = k1 * (1 - b + b * lengths / average)
+    weights = np.array([query[term] for term in terms])
+    return (tf * (k1 + 1) / (tf + norm[:, None]) * (idf * weights)).sum(axis=1)
+
+
+def top_k(posts, scores, k, min_score=0.0):
+    """
+    The k best-scoring posts above min_score, best first, each annotated with 'relevance' and 'rank'.
+
+    Selection uses a k-sized heap, O(n log k), instead of sorting every post.
+    """
+    eligible = (i for i in range(len(posts)) if scores[i] > min_score)
+    best = heapq.nlargest(k, eligible, key=lambda i: scores[i])
+    selected = []
+    for rank, i in enumerate(best, 1):
+        post = posts[i]
+        post['relevance'] = round(float(scores[i]), 3)
+        post['rank'] = rank
+        selected.append(post)
+    return selected
+
+
+def select_relevant(posts, keywords, k, min_score=0.0):
+    """Score posts against keywords and CapLinked's topics and keep the best k, best first"""
+    posts = list(posts)
+    return top_k(posts, bm25_scores(posts, build_query(keywords)), k, min_score)
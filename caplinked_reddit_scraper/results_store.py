@@ -0,0 +1,144 @@
+"""
+Append-only JSONL results store
+One JSON record per line, appended as each result completes and fsynced in batches, with a
+compact sidecar index (offset, length, date, URL) for lookups without reading the history
+"""
+
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+# Records written between fsyncs, and the longest a record may sit unsynced
+FSYNC_BATCH_SIZE = 32
+FSYNC_INTERVAL_SECONDS = 5.0
+
+
+def index_path(path):
+    return os.path.splitext(path)[0] + '.idx'
+
+
+class ResultsStore:
+    """
+    Appends result records to path (JSON Lines) and their index entries to path's .idx.
+
+    Each index line is "offset<TAB>length<TAB>recorded_at<TAB>url". A record
+    is on disk once append() returns and survives a crash once the batch it
+    is in has been fsynced; close() (or leaving the with block) syncs the rest.
+    """
+
+    def __init__(self, path, url_field='url', batch_size=FSYNC_BATCH_SIZE, interval=FSYNC_INTERVAL_SECONDS):
+        self.path = path
+        self.url_field = url_field
+        self.batch_size = batch_size
+        self.interval = interval
+        self.appended = 0
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._lock = threading.Lock()
+
+        self._data = open(path, 'ab')
+        self._index = open(index_path(path), 'ab')
+        # A crash mid-write can leave a torn last line; start ours on a fresh one
+        for f in (self._data, self._index):
+            if f.tell() and not _ends_with_newline(f.name):
+                f.write(b'\n')
+
+    def append(self, record):
+        """Write one record and its index entry"""
+        recorded_at = datetime.now().isoformat(timespec='seconds')
+        line = json.dumps(record, ensure_ascii=False).encode('utf-8') + b'\n'
+        url = str(record.get(self.url_field, '')).replace('\t', ' ').replace('\n', ' ')
+
+        with self._lock:
+            offset = self._data.tell()
+            self._data.write(line)
+            self._index.write(f"{offset}\t{len(line)}\t{recorded_at}\t{url}\n".encode('utf-8'))
+            self._data.flush()
+            self._index.flush()
+            self.appended += 1
+            self._unsynced += 1
+            if self._unsynced >= self.batch_size or time.monotonic() - self._last_sync >= self.interval:
+                self._sync()
+
+    def _sync(self):
+        for f in (self._data, self._index):
+            f.flush()
+            os.fsync(f.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def close(self):
+        with self._lock:
+            if self._data.closed:
+                return
+            self._sync()
+            self._data.close()
+            self._index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _ends_with_newline(path):
+    with open(path, 'rb') as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b'\n'
+
+
+def iter_records(path):
+    """Stream every record in path, oldest first, one line at a time; torn lines are skipped"""
+    if not os.path.exists(path):
+        return
+    with open(path, 'rb') as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+
+def _iter_index(path):
+    try:
+        f = open(index_path(path), 'rb')
+    except FileNotFoundError:
+        return
+    with f:
+        for line in f:
+            parts = line.decode('utf-8').rstrip('\n').split('\t', 3)
+            if len(parts) == 4:
+                yield int(parts[0]), int(parts[1]), parts[2], parts[3]
+
+
+def _read_at(path, entries):
+    with open(path, 'rb') as f:
+        for offset, length, _, _ in entries:
+            f.seek(offset)
+            try:
+                yield json.loads(f.read(length))
+            except ValueError:
+                continue
+
+
+def find_by_url(path, url):
+    """Yield every record stored for url, oldest first, reading only those records"""
+    yield from _read_at(path, [entry for entry in _iter_index(path) if entry[3] == url])
+
+
+def find_by_date(path, start, end=None):
+    """
+    Yield records recorded between start and end (ISO date or datetime strings, end exclusive).
+
+    A bare date such as '2025-01-31' as start covers that whole day when end
+    is omitted.
+    """
+    if end is None and len(start) == 10:
+        end = start + 'T99'
+    yield from _read_at(path, [
+        entry for entry in _iter_index(path)
+        if entry[2] >= start and (end is None or entry[2] < end)
+    ])
@@ -0,0 +1,97 @@
+import re
+import sqlite3
+from datetime import datetime
+from urllib.parse import urlparse, urlunparse
+
+# On-disk index of every post a previous run has already processed
+SEEN_INDEX_FILE = 'reddit_seen_posts.db'
+
+# Reddit post ids live in the path: /r/<subreddit>/comments/<id>/<slug>/
+POST_ID_PATTERN = re.compile(r'/comments/([a-z0-9]+)', re.IGNORECASE)
+POST_PATH_PATTERN = re.compile(r'^/r/([^/]+)/comments/([a-z0-9]+)(?:/([^/]+))?', re.IGNORECASE)
+
+# Short links carry only the id: https://redd.it/<id>
+SHORT_LINK_HOST = 'redd.it'
+
+
+def _reddit_host(host):
+    return host == 'reddit.com' or host.endswith('.reddit.com')
+
+
+def canonical_url(url):
+    """
+    Return the single URL form used for a Reddit post.
+
+    Host variants (reddit.com, old./m./np.reddit.com) become www.reddit.com,
+    the query string and fragment are dropped and the path gets exactly one
+    trailing slash; the post id is lowercased. Other URLs are only trimmed of
+    their fragment and trailing slash.
+    """
+    parsed = urlparse(url.strip())
+    host = parsed.netloc.lower()
+    if _reddit_host(host):
+        match = POST_PATH_PATTERN.match(parsed.path)
+        if match:
+            subreddit, post_id, slug = match.groups()
+            path = f"/r/{subreddit}/comments/{post_id.lower()}/" + (f"{slug}/" if slug else "")
+            return f"https://www.reddit.com{path}"
+        return urlunparse(('https', 'www.reddit.com', parsed.path.rstrip('/') + '/', '', '', ''))
+    return urlunparse((parsed.scheme, host, parsed.path.rstrip('/') or '/', '', parsed.query, ''))
+
+
+def post_key(url):
+    """Return a canonical key for a Reddit post: its base36 id, or a normalized URL"""
+    match = POST_ID_PATTERN.search(url)
+    if match:
+        return f"t3_{match.group(1).lower()}"
+
+    parsed = urlparse(url)
+    host = parsed.netloc.lower()
+    if host == SHORT_LINK_HOST and parsed.path.strip('/'):
+        return f"t3_{parsed.path.strip('/').lower()}"
+    if host.startswith('www.'):
+        host = host[4:]
+    return f"{host}{parsed.path.rstrip('/')}"
+
+
+class SeenIndex:
+    """SQLite-backed set of post keys, mirrored in memory for O(1) lookups"""
+
+    def __init__(self, path=SEEN_INDEX_FILE):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS seen_posts (
+                post_key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                title TEXT,
+                first_seen TEXT NOT NULL
+            )"""
+        )
+        self.conn.commit()
+        self._keys = {row[0] for row in self.conn.execute("SELECT post_key FROM seen_posts")}
+
+    def __contains__(self, url):
+        return post_key(url) in self._keys
+
+    def __len__(self):
+        return len(self._keys)
+
+    def mark_seen(self, posts):
+        """Record posts as processed so later runs skip them"""
+        now = datetime.now().isoformat()
+        rows = [(post_key(post['url']), post['url'], post.get('title'), now) for post in posts]
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO seen_posts (post_key, url, title, first_seen) VALUES (?, ?, ?, ?)",
+            rows
+        )
+        self.conn.commit()
+        self._keys.update(row[0] for row in rows)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,7 +1,21 @@
 import requests
-from bs4 import BeautifulSoup
+from itertools import islice
 from openai import OpenAI
 import os
+try:
+    from .llm_cache import cached_chat_completion
+    from .http_cache import fetch_parsed
+    from .html_extract import iter_elements
+    from .blog_feed import discover_new_posts, commit_discovered
+    from .blog_corpus import get_reduced_article
+    from .prompt_budget import fit_to_budget, count_tokens
+except ImportError:
+    from llm_cache import cached_chat_completion
+    from http_cache import fetch_parsed
+    from html_extract import iter_elements
+    from blog_feed import discover_new_posts, commit_discovered
+    from blog_corpus import get_reduced_article
+    from prompt_budget import fit_to_budget, count_tokens
 
 api_key = os.environ.get("OPENAI_API_KEY", "").strip()
 if not api_key:
@@ -10,42 +24,60 @@ if not api_key:
 
 client = OpenAI(api_key=api_key)
 CAPLINKED_BLOG_URL = "https://www.caplinked.com/blog/"
+# High-water mark name in blog_feed.db; the LinkedIn automation keeps its own
+FEED_CONSUMER = "youtube"
+# Blog text handed to the script prompt: the most informative sentences within this many tokens
+SCRIPT_SOURCE_TOKENS = 500
+
+def _parse_post_urls(html, limit):
+    posts = islice(iter_elements(html, "a", {"class": "uael-post__read-more"}), limit)
+    post_urls = []
+    for _, attrs in posts:
+        href = attrs.get("href")
+        if href:
+            if not href.startswith("http"  ):
+                href = f"https://www.caplinked.com{href}"
+            post_urls.append(href  )
+    return post_urls
 
 def get_latest_blog_posts(url, limit=3  ):
-    print(f"--- Scraping CapLinked blog for latest posts: {url} ---")
+    # Feed/sitemap discovery returns only posts newer than the last committed run, with their dates
+    feed_posts = discover_new_posts(FEED_CONSUMER, limit)
+    if feed_posts is not None:
+        print(f"Found {len(feed_posts)} new blog posts in the blog feed.")
+        return [(post["url"], post["published"]) for post in feed_posts]
+    print(f"--- No blog feed available; scraping CapLinked blog for latest posts: {url} ---")
     try:
-        response = requests.get(url, timeout=15)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, "html.parser")
-        posts = soup.find_all("a", class_="uael-post__read-more", limit=limit)
-        post_urls = []
-        for post in posts:
-            href = post.get("href")
-            if href:
-                if not href.startswith("http"  ):
-                    href = f"https://www.caplinked.com{href}"
-                post_urls.append(href  )
+        # Revalidates with ETag/Last-Modified; an unchanged index is not re-parsed
+        post_urls = fetch_parsed(url, lambda html: _parse_post_urls(html, limit), parser_key=f"post_urls:{limit}", timeout=15)
         print(f"Found {len(post_urls)} new blog posts.")
-        return post_urls
+        return [(post_url, None) for post_url in post_urls]
     except requests.exceptions.RequestException as e:
         print(f"ERROR: Could not fetch blog posts. Details: {e}")
         return []
 
-def get_blog_content(url):
+def mark_blog_posts_seen(finished=None):
+    """Record which of this run's posts finished; the rest come back next run, until given up after repeated failures"""
+    for url in commit_discovered(FEED_CONSUMER, finished):
+        print(f"ERROR: Giving up on blog post after repeated failures: {url}")
+
+def get_blog_content(url, last_modified=None):
     print(f"  -> Scraping content from: {url}")
     try:
-        response = requests.get(url, timeout=15)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, "html.parser")
-        content_div = soup.find("div", class_="post-content")
-        if content_div:
-            for script_or_style in content_div(["script", "style"]):
-                script_or_style.decompose()
-            text = content_div.get_text(separator=" ", strip=True)
-            print(f"    Successfully extracted {len(text)} characters of content.")
-            return text[:2000]
+        # Full text comes from the local blog corpus when stored and no older than last_modified;
+        # otherwise it is fetched and stored there. The budgeted text is stored alongside it.
+        article = get_reduced_article(
+            url,
+            f"budget:{SCRIPT_SOURCE_TOKENS}",
+            lambda content: fit_to_budget(content, SCRIPT_SOURCE_TOKENS),
+            last_modified
+        )
+        if article:
+            text = article["content"]
+            print(f"    Successfully extracted {count_tokens(text)} tokens of content.")
+            return text
         else:
-            print("    ERROR: Could not find post-content div.")
+            print("    ERROR: Could not find post content.")
             return None
     except requests.exceptions.RequestException as e:
         print(f"    ERROR: Could not fetch blog content. Details: {e}")
@@ -55,13 +87,13 @@ def generate_video_script(title, content):
     print(f"    -> Generating video script for: {title}")
     try:
         prompt = f"Create a 2-minute video script for a YouTube video about '{title}'. The script should be engaging, informative, and suitable for an audience of investment bankers, VCs, and corporate development professionals. IMPORTANT: Do NOT include any text overlays, captions, or on-screen text in the video. The video should be purely visual with voiceover narration only. No titles, subtitles, or text elements should appear on screen. Base it on this content: {content}"
-        response = client.chat.completions.create(
+        script = cached_chat_completion(
+            client,
             model="gpt-4.1-mini",
             messages=[{"role": "user", "content": prompt}],
             temperature=0.7,
             max_tokens=1000,
         )
-        script = response.choices[0].message.content
         print("    Successfully generated video script.")
         return script
     except Exception as e:
@@ -74,8 +106,8 @@ def run_content_pipeline():
         print("--- Content pipeline finished: No new posts found. ---")
         return []
     video_scripts = []
-    for post_url in latest_posts:
-        content = get_blog_content(post_url)
+    for post_url, published in latest_posts:
+        content = get_blog_content(post_url, published)
         if content:
             title = post_url.split("/")[-2].replace("-", " ").title()
             script = generate_video_script(title, content)
@@ -0,0 +1,78 @@
+"""
+Targeted HTML extraction
+Parses only the elements a scraper needs instead of building a full html.parser tree
+"""
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+# lxml is much faster than the pure-Python html.parser; fall back when it isn't installed
+try:
+    from lxml import etree
+    PARSER = 'lxml'
+except ImportError:
+    etree = None
+    PARSER = 'html.parser'
+
+CHUNK_SIZE = 64 * 1024
+
+
+def _attrs_match(element_attrs, attrs):
+    """Match attrs the way BeautifulSoup does: class by membership, everything else by equality"""
+    for key, wanted in attrs.items():
+        value = element_attrs.get(key)
+        if value is None:
+            return False
+        if key == 'class':
+            if wanted not in value.split():
+                return False
+        elif value != wanted:
+            return False
+    return True
+
+
+def iter_elements(html, tag, attrs=None):
+    """
+    Yield (text, attributes) for each matching element, in document order.
+
+    With lxml the document is fed to a pull parser in chunks and parsing stops
+    as soon as the caller stops iterating, so taking the first few matches of a
+    large page only parses up to the last one taken. Text is joined like
+    BeautifulSoup's get_text(strip=True).
+    """
+    attrs = attrs or {}
+
+    if etree is None:
+        soup = BeautifulSoup(html, PARSER, parse_only=SoupStrainer(tag, attrs=attrs))
+        for element in soup.find_all(tag, attrs=attrs):
+            yield element.get_text(strip=True), dict(element.attrs)
+        return
+
+    parser = etree.HTMLPullParser(events=('end',), tag=tag)
+    for start in range(0, len(html), CHUNK_SIZE):
+        parser.feed(html[start:start + CHUNK_SIZE])
+        for _, element in parser.read_events():
+            if _attrs_match(element.attrib, attrs):
+                text = ''.join(s.strip() for s in element.itertext())
+                yield text, dict(element.attrib)
+            element.clear(keep_tail=True)
+    try:
+        parser.close()
+    except etree.XMLSyntaxError:
+        # Raised for an empty document; there is nothing left to yield
+        return
+    for _, element in parser.read_events():
+        if _attrs_match(element.attrib, attrs):
+            yield ''.join(s.strip() for s in element.itertext()), dict(element.attrib)
+
+
+def extract(html, name, attrs=None, limit=None):
+    """Return matching elements as BeautifulSoup tags, parsing nothing outside them"""
+    attrs = attrs or {}
+    soup = BeautifulSoup(html, PARSER, parse_only=SoupStrainer(name, attrs=attrs))
+    return soup.find_all(name, attrs=attrs, limit=limit)
+
+
+def extract_first(html, name, attrs=None):
+    """Return the first matching element as a BeautifulSoup tag, or None"""
+    found = extract(html, name, attrs, limit=1)
+    return found[0] if found else None
@@ -1,28 +1,46 @@
 import requests
 import os
+import queue
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+try:
+    from . import http_client
+except ImportError:
+    import http_client
 
 RUNWAY_API_KEY = os.environ.get("RUNWAY_API_KEY", "").strip()
 RUNWAY_API_URL = "https://api.dev.runwayml.com/v1"
 RUNWAY_API_VERSION = "2024-11-06"
 
-def generate_video_from_script(script, title  ):
-    print(f"  -> Submitting video generation job to Runway for: '{title}'")
-    if not RUNWAY_API_KEY:
-        print("    ERROR: RUNWAY_API_KEY environment variable not set.")
-        return None
-    
-    headers = {
+# Polling: start fast, back off while nothing changes, give up after MAX_WAIT_TIME
+POLL_INTERVAL_MIN = 5
+POLL_INTERVAL_MAX = 30
+POLL_BACKOFF = 1.5
+MAX_WAIT_TIME = 600
+
+# Video downloads stream to disk in fixed-size chunks and resume with HTTP Range after a drop
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+DOWNLOAD_MAX_ATTEMPTS = 5
+# Finished videos download side by side, off the poll loop, so polling never waits on a download
+DOWNLOAD_WORKERS = 3
+
+def _headers():
+    return {
         "Authorization": f"Bearer {RUNWAY_API_KEY}",
         "Content-Type": "application/json",
         "X-Runway-Version": RUNWAY_API_VERSION
     }
-    
+
+def submit_video_job(script, title):
+    """Submit a text-to-video job and return its Runway task id, or None"""
+    print(f"  -> Submitting video generation job to Runway for: '{title}'")
+
     # Add the "NO TEXT OVERLAYS" instruction but keep total under 1000 characters
     instruction = "IMPORTANT: Do NOT include any text overlays, captions, or on-screen text. The video should be purely visual with no text elements. "
     remaining_chars = 1000 - len(instruction)
     enhanced_script = instruction + script[:remaining_chars]
-    
+
     payload = {
         "model": "veo3.1",
         "promptText": enhanced_script,
@@ -30,45 +48,200 @@ def generate_video_from_script(script, title  ):
         "duration": 8,
         "audio": True
     }
-    
+
     try:
-        response = requests.post(f"{RUNWAY_API_URL}/text_to_video", headers=headers, json=payload, timeout=30)
+        response = http_client.post(f"{RUNWAY_API_URL}/text_to_video", headers=_headers(), json=payload, timeout=30)
         response.raise_for_status()
-        job_data = response.json()
-        job_id = job_data.get("id")
+        job_id = response.json().get("id")
         if not job_id:
             print("    ERROR: Failed to get a job ID from Runway.")
             return None
-        print(f"    Successfully submitted job. Job ID: {job_id}. Waiting for video generation...")
-        
-        max_wait_time = 600
-        start_time = time.time()
-        while time.time() - start_time < max_wait_time:
-            time.sleep(10)
-            status_response = requests.get(f"{RUNWAY_API_URL}/tasks/{job_id}", headers=headers, timeout=30)
-            status_response.raise_for_status()
-            status_data = status_response.json()
+        print(f"    Successfully submitted job. Job ID: {job_id}.")
+        return job_id
+    except requests.exceptions.RequestException as e:
+        print(f"    ERROR: An error occurred with the Runway API. Details: {e}")
+        return None
+
+def _video_url(output):
+    return output[0] if isinstance(output, list) else (output if isinstance(output, str) else output.get("url"))
+
+def _expected_size(response, offset):
+    """Total file size from Content-Range (206) or Content-Length (200), if the server sent one"""
+    content_range = response.headers.get("Content-Range", "")
+    if "/" in content_range and not content_range.endswith("/*"):
+        return int(content_range.rsplit("/", 1)[1])
+    content_length = response.headers.get("Content-Length")
+    return offset + int(content_length) if content_length else None
+
+def download_video(video_url, title):
+    """
+    Stream a video to /tmp in DOWNLOAD_CHUNK_SIZE pieces so memory use stays flat.
+
+    Bytes land in a .part file; after a dropped connection the next attempt asks
+    for the remainder with a Range header. The finished file is checked against
+    the server's reported size before it is moved into place. Raises OSError
+    when every attempt fails.
+    """
+    file_path = f"/tmp/{title.replace(' ', '_')}.mp4"
+    part_path = file_path + ".part"
+    if os.path.exists(part_path):
+        os.remove(part_path)
+    expected = None
+
+    for attempt in range(DOWNLOAD_MAX_ATTEMPTS):
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+        try:
+            with http_client.get(video_url, headers=headers, stream=True, timeout=(10, 60)) as response:
+                if response.status_code == 416 and expected is not None and offset == expected:
+                    break
+                response.raise_for_status()
+                if offset and response.status_code != 206:
+                    # Server ignored the Range header; start over
+                    offset = 0
+                expected = _expected_size(response, offset) or expected
+                with open(part_path, "ab" if offset else "wb") as f:
+                    for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                        f.write(chunk)
+        except requests.exceptions.RequestException as e:
+            received = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+            print(f"    WARNING: Download interrupted at {received} bytes (attempt {attempt + 1}/{DOWNLOAD_MAX_ATTEMPTS}). Details: {e}")
+            time.sleep(2 ** attempt)
+            continue
+
+        size = os.path.getsize(part_path)
+        if expected is None or size == expected:
+            break
+        print(f"    WARNING: Downloaded {size} of {expected} bytes, resuming...")
+        if size > expected:
+            os.remove(part_path)
+    else:
+        raise OSError(f"Could not download {video_url} after {DOWNLOAD_MAX_ATTEMPTS} attempts")
+
+    os.replace(part_path, file_path)
+    print(f"    Video downloaded to: {file_path} ({os.path.getsize(file_path)} bytes)")
+    return file_path
+
+def _download_and_report(video_url, video_data, report):
+    title = video_data["title"]
+    try:
+        file_path = download_video(video_url, title)
+    except (requests.exceptions.RequestException, OSError) as e:
+        print(f"    ERROR: Could not download video for '{title}'. Details: {e}")
+        file_path = None
+    report(video_data, file_path)
+
+def _poll_jobs(pending, report, downloads):
+    """
+    Poll the pending {job_id: video_data} jobs until each finishes or MAX_WAIT_TIME passes.
+
+    Each finished video is handed to the downloads executor, which calls
+    report(video_data, file_path) once it is on disk; report gets None when
+    generation or download failed or the job timed out. Finished jobs are
+    removed from pending, and MAX_WAIT_TIME covers generation only. The poll interval
+    starts at POLL_INTERVAL_MIN and grows by POLL_BACKOFF (up to
+    POLL_INTERVAL_MAX) while no job changes status.
+    """
+    statuses = {}
+    interval = POLL_INTERVAL_MIN
+    start_time = time.time()
+    while pending and time.time() - start_time < MAX_WAIT_TIME:
+        time.sleep(interval)
+        changed = False
+        for job_id in list(pending):
+            video_data = pending[job_id]
+            title = video_data["title"]
+            try:
+                status_response = http_client.get(f"{RUNWAY_API_URL}/tasks/{job_id}", headers=_headers(), timeout=30)
+                status_response.raise_for_status()
+                status_data = status_response.json()
+            except requests.exceptions.RequestException as e:
+                print(f"    WARNING: Could not poll job {job_id} for '{title}'. Details: {e}")
+                continue
+
             status = status_data.get("status")
-            print(f"    Job status: {status}")
+            if status != statuses.get(job_id):
+                statuses[job_id] = status
+                changed = True
+                print(f"    Job status for '{title}': {status}")
+
             if status == "SUCCEEDED":
+                del pending[job_id]
                 output = status_data.get("output")
-                if output:
-                    video_url = output[0] if isinstance(output, list) else (output if isinstance(output, str) else output.get("url"))
-                    print(f"    Video generation successful. Video URL: {video_url}")
-                    video_content = requests.get(video_url).content
-                    file_path = f"/tmp/{title.replace(' ', '_')}.mp4"
-                    with open(file_path, 'wb') as f:
-                        f.write(video_content)
-                    print(f"    Video downloaded to: {file_path}")
-                    return file_path
+                if not output:
+                    print(f"    ERROR: Job for '{title}' succeeded without an output URL.")
+                    report(video_data, None)
+                    continue
+                video_url = _video_url(output)
+                print(f"    Video generation successful. Video URL: {video_url}")
+                downloads.submit(_download_and_report, video_url, video_data, report)
             elif status in ["FAILED", "TIMED_OUT"]:
-                print(f"    ERROR: Video generation failed with status: {status}")
-                return None
-        print("    ERROR: Video generation timed out after 10 minutes.")
-        return None
-    except requests.exceptions.RequestException as e:
-        print(f"    ERROR: An error occurred with the Runway API. Details: {e}")
-        return None
+                del pending[job_id]
+                print(f"    ERROR: Video generation for '{title}' failed with status: {status}")
+                report(video_data, None)
+
+        interval = POLL_INTERVAL_MIN if changed else min(interval * POLL_BACKOFF, POLL_INTERVAL_MAX)
+
+    for job_id in list(pending):
+        video_data = pending.pop(job_id)
+        print(f"    ERROR: Video generation for '{video_data['title']}' timed out after {MAX_WAIT_TIME // 60} minutes.")
+        report(video_data, None)
+
+def generate_videos_from_scripts(scripts_data):
+    """
+    Submit a Runway job for every script up front, then poll them all in a background thread.
+
+    Yields (video_data, file_path) for each script as soon as its video is
+    downloaded; file_path is None when submission, generation or download
+    failed or the job timed out. Polling and downloading carry on while the
+    caller works on a yielded video (an upload, say), so that time neither
+    delays other jobs nor counts against them.
+    """
+    if not RUNWAY_API_KEY:
+        print("    ERROR: RUNWAY_API_KEY environment variable not set.")
+        for video_data in scripts_data:
+            yield video_data, None
+        return
+
+    pending = {}
+    for video_data in scripts_data:
+        job_id = submit_video_job(video_data["script"], video_data["title"])
+        if job_id:
+            pending[job_id] = video_data
+        else:
+            yield video_data, None
+
+    if not pending:
+        return
+    print(f"  -> Waiting for {len(pending)} Runway job(s)...")
+
+    results = queue.Queue()
+    done = object()
+
+    def poll():
+        try:
+            # Leaving the with block waits for every download handed off
+            with ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS) as downloads:
+                _poll_jobs(pending, lambda video_data, file_path: results.put((video_data, file_path)), downloads)
+        except Exception as e:
+            print(f"    ERROR: Polling Runway jobs failed. Details: {e}")
+            for video_data in pending.values():
+                results.put((video_data, None))
+        finally:
+            results.put(done)
+
+    threading.Thread(target=poll, daemon=True).start()
+    while True:
+        result = results.get()
+        if result is done:
+            return
+        yield result
+
+def generate_video_from_script(script, title  ):
+    """Generate a single video and return its local path, or None"""
+    for _, file_path in generate_videos_from_scripts([{"title": title, "script": script}]):
+        return file_path
+    return None
 
 if __name__ == "__main__":
     print("--- Testing Runway Generator ---")
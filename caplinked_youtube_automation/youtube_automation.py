@@ -1,7 +1,11 @@
 import os
-from .content_pipeline import run_content_pipeline
-from .runway_generator import generate_video_from_script
-from .youtube_uploader import get_authenticated_service, upload_video
+from concurrent.futures import ThreadPoolExecutor
+from .content_pipeline import run_content_pipeline, mark_blog_posts_seen
+from .runway_generator import generate_videos_from_scripts
+from .youtube_uploader import get_authenticated_service, generate_seo_metadata, upload_video
+from .llm_cache import cache_stats
+from .http_cache import cache_stats as http_cache_stats
+from .blog_corpus import get_corpus
 
 def main():
     """Main orchestrator for the entire YouTube automation pipeline."""
@@ -18,20 +22,33 @@ def main():
         print("--- Pipeline aborted: Could not authenticate with YouTube. ---")
         print("Please ensure a valid 'token.pickle' file exists in the repository.")
         return
-    # 3. Generate and upload videos for each script
-    for video_data in scripts_data:
-        title = video_data["title"]
-        script = video_data["script"]
-        source_url = video_data["source_url"]
-        print(f"--- Processing script for: {title} ---")
-        # a. Generate video using Runway AI
-        video_path = generate_video_from_script(script, title)
-        if not video_path:
-            print(f"  -> Skipping upload for '{title}' as video generation failed.")
-            continue
-        # b. Upload the generated video to YouTube
-        # Note: upload_video now generates SEO metadata internally from the script
-        upload_video(youtube_service, video_path, title, script)
+    # Source URLs of the blog posts whose video made it to YouTube
+    uploaded = set()
+    # 3. Generate SEO metadata in the background while Runway renders the videos
+    with ThreadPoolExecutor(max_workers=len(scripts_data)) as metadata_pool:
+        metadata_futures = {
+            id(video_data): metadata_pool.submit(generate_seo_metadata, video_data["title"], video_data["script"])
+            for video_data in scripts_data
+        }
+        # 4. Submit every script to Runway at once, then upload each video as soon as it is ready
+        for video_data, video_path in generate_videos_from_scripts(scripts_data):
+            title = video_data["title"]
+            script = video_data["script"]
+            source_url = video_data["source_url"]
+            print(f"--- Processing video for: {title} ---")
+            if not video_path:
+                print(f"  -> Skipping upload for '{title}' as video generation failed.")
+                continue
+            # Upload the generated video to YouTube with its already generated metadata
+            seo_metadata = metadata_futures[id(video_data)].result()
+            if upload_video(youtube_service, video_path, title, script, seo_metadata=seo_metadata):
+                uploaded.add(source_url)
+    # Only now are this run's blog posts done with; a crash before here retries them next run, and so
+    # does any post whose script, video or upload failed. Uploaded posts are never offered again.
+    mark_blog_posts_seen(uploaded)
+    print(cache_stats())
+    print(http_cache_stats())
+    print(get_corpus().stats())
     print("--- YouTube Automation Pipeline Finished ---")
 
 if __name__ == "__main__":
@@ -1,17 +1,35 @@
 import os
 import pickle
+import random
 import time
+import httplib2
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
 from googleapiclient.http import MediaFileUpload
 from openai import OpenAI
+try:
+    from .llm_cache import cached_chat_completion
+    from .prompt_budget import fit_to_budget
+except ImportError:
+    from llm_cache import cached_chat_completion
+    from prompt_budget import fit_to_budget
 
 SCOPES = ["https://www.googleapis.com/auth/youtube.upload"]
 CLIENT_SECRETS_FILE = "/etc/secrets/client_secret.json"
 TOKEN_PICKLE_FILE = "/opt/render/project/src/token.pickle"
 
+# Script excerpt given to the metadata prompt: its most informative sentences within this many tokens
+SEO_SCRIPT_TOKENS = 125
+
+# Resumable uploads: bytes per request, and retries per chunk
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+UPLOAD_MAX_RETRIES = 8
+RETRIABLE_STATUS_CODES = {500, 502, 503, 504}
+RETRIABLE_EXCEPTIONS = (httplib2.HttpLib2Error, IOError)
+
 # Initialize OpenAI client with explicit API key
 api_key = os.environ.get("OPENAI_API_KEY", "" ).strip()
 if not api_key:
@@ -44,7 +62,7 @@ def generate_seo_metadata(title, script, max_retries=3):
         try:
             prompt = f"""Generate SEO-optimized metadata for a YouTube video about: {title}
 
-The video script is: {script[:500]}
+The video script is: {fit_to_budget(script, SEO_SCRIPT_TOKENS)}
 
 Please provide:
 1. A compelling YouTube title (60 characters max) that includes keywords about virtual data rooms, M&A, or finance
@@ -56,15 +74,14 @@ TITLE: [title]
 DESCRIPTION: [description]
 TAGS: [tags]"""
             
-            response = client.chat.completions.create(
+            content = cached_chat_completion(
+                client,
                 model="gpt-4.1-mini",
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.7,
                 max_tokens=500,
                 timeout=30
             )
-            
-            content = response.choices[0].message.content
             lines = content.split('\n')
             
             title_line = next((l for l in lines if l.startswith('TITLE:')), None)
@@ -89,13 +106,54 @@ TAGS: [tags]"""
     
     return title, f"Learn more about {title} on the CapLinked blog.", ["CapLinked", "VDR", "M&A"]
 
-def upload_video(youtube_service, video_file_path, title, script):
+def _resumable_upload(request, video_file_path):
+    """
+    Drive a resumable upload chunk by chunk and return the API response.
+
+    5xx responses and transport errors are retried with jittered exponential
+    backoff. The request keeps its session URI across retries, and after a
+    failed chunk its next call asks the server how many bytes it holds and
+    continues from there, so only the lost chunk is sent again.
+    """
+    total = os.path.getsize(video_file_path)
+    response = None
+    retry = 0
+    while response is None:
+        sent_before = request.resumable_progress
+        started = time.time()
+        try:
+            status, response = request.next_chunk()
+        except HttpError as e:
+            if e.resp.status not in RETRIABLE_STATUS_CODES:
+                raise
+            error = f"HTTP {e.resp.status}"
+        except RETRIABLE_EXCEPTIONS as e:
+            error = f"{type(e).__name__}: {e}"
+        else:
+            retry = 0
+            if status:
+                elapsed = max(time.time() - started, 1e-6)
+                sent = status.resumable_progress - sent_before
+                print(f"    Uploaded {status.resumable_progress}/{total} bytes ({int(status.progress() * 100)}%) at {sent / elapsed / 1024 / 1024:.2f} MB/s")
+            continue
+
+        retry += 1
+        if retry > UPLOAD_MAX_RETRIES:
+            raise RuntimeError(f"Upload failed after {UPLOAD_MAX_RETRIES} retries ({error})")
+        delay = random.random() * min(2 ** retry, 64)
+        print(f"    WARNING: Upload chunk failed ({error}). Retry {retry}/{UPLOAD_MAX_RETRIES} in {delay:.1f} seconds...")
+        time.sleep(delay)
+
+    return response
+
+def upload_video(youtube_service, video_file_path, title, script, seo_metadata=None):
+    """Upload a video; seo_metadata is a (title, description, tags) tuple, generated here if not given"""
     print(f"  -> Uploading video to YouTube: '{title}'")
     if not os.path.exists(video_file_path):
         print(f"    ERROR: Video file not found at {video_file_path}")
         return False
     
-    seo_title, seo_description, seo_tags = generate_seo_metadata(title, script)
+    seo_title, seo_description, seo_tags = seo_metadata or generate_seo_metadata(title, script)
     
     try:
         body = {
@@ -109,9 +167,9 @@ def upload_video(youtube_service, video_file_path, title, script):
                 'privacyStatus': 'public'
             }
         }
-        media = MediaFileUpload(video_file_path, mimetype='video/mp4', resumable=True)
+        media = MediaFileUpload(video_file_path, mimetype='video/mp4', chunksize=UPLOAD_CHUNK_SIZE, resumable=True)
         request = youtube_service.videos().insert(part='snippet,status', body=body, media_body=media)
-        response = request.execute()
+        response = _resumable_upload(request, video_file_path)
         video_id = response.get('id')
         print(f"    Successfully uploaded video. Video ID: {video_id}")
         print(f"    Video URL: https://www.youtube.com/watch?v={video_id}" )